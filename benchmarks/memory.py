@@ -0,0 +1,278 @@
+"""Memory benchmarks for uritemplate.
+
+Run them from the root of the repository::
+
+    python benchmarks/memory.py
+    python benchmarks/memory.py --sizes 10000 100000 1000000
+    python benchmarks/memory.py --save benchmarks/memory-baseline.json
+    python benchmarks/memory.py --compare benchmarks/memory-baseline.json
+
+Memory is measured with :mod:`tracemalloc`, which counts what Python
+allocates. The benchmarks report:
+
+- the bytes each template keeps alive, for several numbers of distinct
+  templates, parsed eagerly, lazily, and with ``loads``, and the bytes per
+  expression of those templates
+- the bytes held by the template cache behind ``uritemplate.expand`` when
+  it is full
+- the peak of the memory allocated while expanding, and the number of
+  bytes and blocks allocated per call that are still alive afterwards,
+  which should be none
+
+With ``--compare``, a measurement that grew by more than ``--tolerance``
+compared to the baseline is a regression, and the run exits with status 1.
+Sizes depend on the Python version and implementation and on the kind of
+processor. When those of the baseline differ, it is not checked, and the
+run exits with status 2.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+import typing as t
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from throughput import GITHUB_TEMPLATES  # noqa: E402
+from throughput import GITHUB_VALUES  # noqa: E402
+from throughput import SHAPES  # noqa: E402
+from throughput import environment  # noqa: E402
+from throughput import environment_changes  # noqa: E402
+
+import uritemplate  # noqa: E402
+
+Results = t.Dict[str, t.Dict[str, float]]
+
+#: Expressions in each template made by :func:`distinct_templates`
+EXPRESSIONS = 3
+
+
+def distinct_templates(count: int) -> t.List[str]:
+    """Return ``count`` different template strings of a typical size."""
+    return [
+        f"https://api.example.com/v1/resource{i}{{/id}}/items"
+        f"{{?page,per_page}}{{#section}}"
+        for i in range(count)
+    ]
+
+
+def retained(build: t.Callable[[], object]) -> t.Tuple[int, int, object]:
+    """Return the bytes and blocks kept alive by the result of ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = build()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return size, blocks, result
+
+
+def measure_templates(count: int) -> Results:
+    uris = distinct_templates(count)
+    blobs = [uritemplate.dumps(uritemplate.URITemplate(uri)) for uri in uris]
+    builders: t.Dict[str, t.Callable[[], object]] = {
+        "eager": lambda: [uritemplate.URITemplate(uri) for uri in uris],
+        "lazy": lambda: [
+            uritemplate.URITemplate(uri, lazy=True) for uri in uris
+        ],
+        "loads": lambda: [uritemplate.loads(blob) for blob in blobs],
+    }
+    results = {}
+    for kind, build in builders.items():
+        size, blocks, templates = retained(build)
+        # The list itself is not part of what a template costs.
+        size -= sys.getsizeof(templates)
+        results[f"templates/{kind}/{count}"] = {
+            "bytes_per_template": size / count,
+            "bytes_per_expression": size / (count * EXPRESSIONS),
+            "blocks_per_template": blocks / count,
+        }
+        del templates
+    return results
+
+
+def measure_cache() -> Results:
+    maxsize = uritemplate.cache_info().maxsize
+    uris = distinct_templates(maxsize)
+    uritemplate.cache_clear()
+
+    def fill() -> None:
+        for uri in uris:
+            uritemplate.expand(uri, id=1)
+
+    size, blocks, _ = retained(fill)
+    uritemplate.cache_clear()
+    return {
+        f"cache/full/{maxsize}": {
+            "bytes": size,
+            "bytes_per_template": size / maxsize,
+        }
+    }
+
+
+def measure_call(
+    call: t.Callable[[], object], calls: int
+) -> t.Dict[str, float]:
+    """Measure the peak and the leftovers of ``calls`` calls."""
+    call()  # Warm up caches that are meant to be kept
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        current, peak = tracemalloc.get_traced_memory()
+        # A full collection also empties the free lists of tuples and
+        # other objects, so collect before both snapshots.
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            call()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "peak_bytes": peak - current,
+        "retained_bytes_per_call": sum(s.size_diff for s in stats) / calls,
+        "retained_blocks_per_call": sum(s.count_diff for s in stats) / calls,
+    }
+
+
+def measure_expand(calls: int) -> Results:
+    results = {}
+    for operator in ("", "+", "/", "?"):
+        for shape, value in SHAPES.items():
+            template = uritemplate.URITemplate("{%sv}" % operator)
+            values = {"v": value}
+            name = f"expand/{operator or 'simple'}/{shape}"
+            results[name] = measure_call(
+                lambda: template.expand(values), calls
+            )
+
+    github = [uritemplate.URITemplate(uri) for uri in GITHUB_TEMPLATES]
+
+    def expand_github() -> None:
+        for template in github:
+            template.expand(GITHUB_VALUES)
+
+    results["expand/github"] = measure_call(expand_github, calls)
+    many = [dict(GITHUB_VALUES, number=n) for n in range(1000)]
+    results["expand-many/github-1000"] = measure_call(
+        lambda: github[2].expand_many(many), max(calls // 100, 1)
+    )
+    results["api-expand/github"] = measure_call(
+        lambda: uritemplate.expand(GITHUB_TEMPLATES[1], GITHUB_VALUES), calls
+    )
+    return results
+
+
+def compare(
+    results: Results, baseline: Results, tolerance: float
+) -> t.List[str]:
+    """Return the measurements that grew by more than allowed."""
+    regressions = []
+    for name, result in results.items():
+        for key, value in result.items():
+            previous = baseline.get(name, {}).get(key)
+            if previous is None:
+                continue
+            # Allow a few bytes of noise in values that should be zero.
+            if value > max(previous * (1 + tolerance), previous + 64):
+                regressions.append(f"{name} {key}")
+    return regressions
+
+
+def report(results: Results) -> None:
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        measurements = "  ".join(
+            f"{key}={value:,.1f}" for key, value in result.items()
+        )
+        print(f"{name:<{width}}  {measurements}")
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="numbers of templates to measure (default: 10000 100000)",
+    )
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=1000,
+        help="calls per expansion measurement (default: 1000)",
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="baseline JSON to compare against"
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="write the results as a baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed growth against the baseline (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    results: Results = {}
+    for count in args.sizes:
+        results.update(measure_templates(count))
+    results.update(measure_cache())
+    results.update(measure_expand(args.calls))
+    report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as baseline_file:
+            json.dump(
+                {"environment": environment(), "results": results},
+                baseline_file,
+                indent=2,
+                sort_keys=True,
+            )
+            baseline_file.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            saved = json.load(baseline_file)
+        changes = environment_changes(
+            environment(), saved.get("environment", {})
+        )
+        if changes:
+            print(
+                "\nThe baseline was saved in another environment, so it was "
+                "not checked for regressions:",
+                *changes,
+                sep="\n  ",
+            )
+            return 2
+        regressions = compare(results, saved["results"], args.tolerance)
+        if regressions:
+            print(
+                f"\n{len(regressions)} measurement(s) more than "
+                f"{args.tolerance:.0%} larger than the baseline:",
+                *regressions,
+                sep="\n  ",
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Thread scaling benchmarks for uritemplate.
+
+Run them from the root of the repository::
+
+    python benchmarks/threads.py
+    python benchmarks/threads.py --threads 1 2 4 8 16
+    python3.13t benchmarks/threads.py --min-efficiency 0.8
+
+Every benchmark shares the same templates between all threads, which start
+together and each do the same number of operations. It reports the total
+operations per second for each number of threads, and the efficiency: the
+speedup over one thread divided by the number of threads. With the GIL,
+threads take turns and the efficiency drops to about ``1 / threads``. On a
+free-threaded build it should stay close to 1.
+
+With ``--min-efficiency``, the run exits with status 1 when a benchmark
+scales worse than that at the highest number of threads.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import typing as t
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from throughput import GITHUB_TEMPLATES  # noqa: E402
+from throughput import GITHUB_VALUES  # noqa: E402
+from throughput import Operation  # noqa: E402
+
+import uritemplate  # noqa: E402
+
+
+def benchmarks() -> t.Dict[str, Operation]:
+    """Return every benchmark, by name."""
+    github = [uritemplate.URITemplate(uri) for uri in GITHUB_TEMPLATES]
+
+    def expand_shared() -> None:
+        for template in github:
+            template.expand(GITHUB_VALUES)
+
+    def expand_cached() -> None:
+        for uri in GITHUB_TEMPLATES:
+            uritemplate.expand(uri, GITHUB_VALUES)
+
+    issue = github[2].expand(GITHUB_VALUES)
+    router = uritemplate.TemplateRouter(github)
+    return {
+        "expand/shared-templates": expand_shared,
+        "expand/api-cache": expand_cached,
+        "match/router": lambda: router.match(issue),
+    }
+
+
+def run(operation: Operation, threads: int, iterations: int) -> float:
+    """Return the seconds ``threads`` threads take to each do the work."""
+    barrier = threading.Barrier(threads + 1)
+
+    def work() -> None:
+        barrier.wait()
+        for _ in range(iterations):
+            operation()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or bool(is_gil_enabled())
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cpus = os.cpu_count() or 1
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[n for n in (1, 2, 4, 8) if n <= cpus],
+        help="numbers of threads to run, starting with 1 (default: 1 2 4 8, "
+        "up to the number of CPUs)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=2000,
+        help="operations per thread (default: 2000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs per number of threads, the fastest counts (default: 3)",
+    )
+    parser.add_argument(
+        "--min-efficiency",
+        type=float,
+        help="fail when the efficiency at the most threads is lower",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]}, GIL enabled: {gil_enabled()}")
+    print(
+        f"{'benchmark':<24}  {'threads':>7}  {'ops/sec':>12}  "
+        f"{'efficiency':>10}"
+    )
+    failures = []
+    for name, operation in benchmarks().items():
+        operation()
+        single = 0.0
+        efficiency = 1.0
+        for threads in args.threads:
+            seconds = min(
+                run(operation, threads, args.iterations)
+                for _ in range(args.repeat)
+            )
+            rate = threads * args.iterations / seconds
+            if not single:
+                single = rate / threads
+            efficiency = rate / (single * threads)
+            print(
+                f"{name:<24}  {threads:>7}  {rate:>12,.0f}  "
+                f"{efficiency:>10.2f}"
+            )
+        if args.min_efficiency is not None:
+            if efficiency < args.min_efficiency:
+                failures.append(name)
+
+    if failures:
+        print(
+            f"\n{len(failures)} benchmark(s) scale worse than "
+            f"{args.min_efficiency}:",
+            *failures,
+            sep="\n  ",
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+"""Throughput benchmarks for uritemplate.
+
+Run them from the root of the repository::
+
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --save benchmarks/baseline.json
+    python benchmarks/throughput.py --compare benchmarks/baseline.json
+
+Every benchmark calls one operation in batches that take a couple of
+milliseconds each. It reports the operations per second, from the median
+batch, and the 50th, 90th and 99th percentile of the time per operation
+across batches. With ``--compare``, a benchmark that is more than
+``--tolerance`` slower than in the baseline is a regression, and the run
+exits with status 1.
+
+Each batch is followed by one of a reference operation that only uses the
+standard library, and changes are measured relative to it. This takes out
+most of the difference between a faster or slower machine, or a busier
+one, and the one that saved the baseline. What is left is noise of up to
+about 30% on shared machines, hence the default tolerance of 40%.
+
+How fast each benchmark is compared to the others still depends on the
+Python version and implementation, and on the kind of processor. When the
+baseline was saved with another ``major.minor`` version of Python, another
+implementation, or another kind of processor, the changes are reported but
+not checked, and the run exits with status 2 so that it does not pass
+unnoticed. Save a baseline in the same environment to compare against.
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import typing as t
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import uritemplate  # noqa: E402
+from uritemplate import variable  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+Operation = t.Callable[[], object]
+
+#: Values of every shape expand() accepts, as used by the RFC examples
+SHAPES: t.Dict[str, variable.VariableValue] = {
+    "scalar": "Hello World!",
+    "list": ["red", "green", "blue"],
+    "dict": {"semi": ";", "dot": ".", "comma": ","},
+    "tuples": t.cast(
+        variable.VariableValue,
+        [("semi", ";"), ("dot", "."), ("comma", ",")],
+    ),
+}
+
+OPERATORS = ["", "+", "#", ".", "/", ";", "?", "&"]
+
+#: Templates of a hypermedia API, with typical values
+GITHUB_TEMPLATES = [
+    "https://api.github.com/users{/user}",
+    "https://api.github.com/users/{user}/repos{?type,sort,direction,page}",
+    "https://api.github.com/repos/{owner}/{repo}/issues{/number}",
+    "https://api.github.com/repos/{owner}/{repo}/contents/{+path}",
+    "https://api.github.com/repos/{owner}/{repo}/git/trees{/sha}",
+    "https://api.github.com/search/code{?q,page,per_page,sort,order}",
+    "https://github.com/{owner}/{repo}/blob/{ref}/{+path}{#line}",
+    "https://api.github.com/repos/{owner}/{repo}/labels{/name}",
+]
+GITHUB_VALUES: variable.VariableValueMapping = {
+    "user": "octocat",
+    "owner": "python-hyper",
+    "repo": "uritemplate",
+    "number": 1347,
+    "path": "uritemplate/variable.py",
+    "sha": "6dcb09b5b57875f334f61aebed695e2e4193db5e",
+    "type": "owner",
+    "sort": "updated",
+    "direction": "desc",
+    "page": 2,
+    "per_page": 100,
+    "q": "addClass in:file language:js repo:jquery/jquery",
+    "order": "asc",
+    "ref": "main",
+    "line": "L42",
+    "name": "good first issue",
+}
+
+
+def load_fixture_cases() -> (
+    t.List[t.Tuple[str, variable.VariableValueMapping]]
+):
+    cases = []
+    for name in ("spec-examples", "extended-tests"):
+        path = os.path.join(FIXTURES, name + ".json")
+        with open(path, encoding="utf-8") as fixture:
+            examples = json.load(fixture)
+        for example in examples.values():
+            for template, expected in example["testcases"]:
+                if expected is not False:
+                    cases.append((template, example["variables"]))
+    return cases
+
+
+def benchmarks() -> t.Dict[str, Operation]:
+    """Return every benchmark, by name."""
+    cases: t.Dict[str, Operation] = {}
+
+    # Parsing
+    for index, uri in enumerate(GITHUB_TEMPLATES[:3]):
+        cases[f"parse/github-{index}"] = functools.partial(
+            uritemplate.URITemplate, uri
+        )
+    rfc = "{var}{+path}{#hello}{.list}{/list*}{;keys}{?var,hello}{&keys*}"
+    cases["parse/all-operators"] = lambda: uritemplate.URITemplate(rfc)
+    cases["parse/lazy"] = lambda: uritemplate.URITemplate(rfc, lazy=True)
+
+    # Expansion per operator and value shape
+    for operator in OPERATORS:
+        for shape, value in SHAPES.items():
+            for explode in ("", "*"):
+                if explode and shape == "scalar":
+                    continue
+                template = uritemplate.URITemplate(
+                    f"{{{operator}v{explode}}}"
+                )
+                values = {"v": value}
+                name = f"expand/{operator or 'simple'}{explode}/{shape}"
+                cases[name] = functools.partial(template.expand, values)
+
+    # Realistic workloads
+    github = [uritemplate.URITemplate(uri) for uri in GITHUB_TEMPLATES]
+
+    def expand_github() -> None:
+        for template in github:
+            template.expand(GITHUB_VALUES)
+
+    cases["workload/github-expand"] = expand_github
+
+    fixtures = [
+        (uritemplate.URITemplate(uri), values)
+        for uri, values in load_fixture_cases()
+    ]
+
+    def expand_fixtures() -> None:
+        for template, values in fixtures:
+            template.expand(values)
+
+    cases["workload/rfc-fixtures"] = expand_fixtures
+
+    def api_expand_github() -> None:
+        for uri in GITHUB_TEMPLATES:
+            uritemplate.expand(uri, GITHUB_VALUES)
+
+    cases["workload/api-expand-cached"] = api_expand_github
+
+    repo_issues = github[2]
+    many = [dict(GITHUB_VALUES, number=n % 50) for n in range(200)]
+    cases["workload/expand-many"] = lambda: repo_issues.expand_many(many)
+
+    # Partial expansion and variables
+    search = github[5]
+    cases["partial/bind-one"] = lambda: search.partial(q="uritemplate")
+    bound = search.partial(q="uritemplate")
+    cases["partial/expand-bound"] = lambda: bound.expand(page=2)
+    cases["variables/api"] = lambda: uritemplate.variables(
+        GITHUB_TEMPLATES[5]
+    )
+
+    # Matching
+    issue = repo_issues.expand(GITHUB_VALUES)
+    cases["match/template"] = lambda: repo_issues.match(issue)
+    router = uritemplate.TemplateRouter(github)
+    cases["match/router"] = lambda: router.match(issue)
+    # Templates that only differ after their expressions, where a lookup
+    # should take as long with 4000 of them as with 40.
+    for count in (40, 4000):
+        resources = uritemplate.TemplateRouter(
+            f"https://api.example.com/repos/{{owner}}/{{repo}}/res{i}{{?page}}"
+            for i in range(count)
+        )
+        resource = f"https://api.example.com/repos/a/b/res{count - 1}?page=2"
+        cases[f"match/router-{count}"] = functools.partial(
+            resources.match, resource
+        )
+    return cases
+
+
+def reference() -> None:
+    """Percent-encode and join values with the standard library only.
+
+    This is the kind of work that expanding a template does, but it does
+    not change with uritemplate, so it measures how fast the machine runs
+    Python code at the moment.
+    """
+    quote = urllib.parse.quote
+    "&".join(
+        [
+            f"{name}={quote(str(value))}"
+            for name, value in GITHUB_VALUES.items()
+        ]
+    )
+
+
+def calibrate(operation: Operation, batch_time: float) -> int:
+    """Return how many calls of ``operation`` take ``batch_time``."""
+    timer = time.perf_counter
+    number = 1
+    while True:
+        start = timer()
+        for _ in range(number):
+            operation()
+        elapsed = timer() - start
+        if elapsed >= batch_time:
+            return number
+        number *= 2
+
+
+def measure(
+    operation: Operation, batches: int, batch_time: float
+) -> t.Dict[str, float]:
+    """Time ``operation`` and summarize the time it takes per call.
+
+    The reference operation is timed in batches between those of
+    ``operation``, as ``reference_ops_per_sec``.
+    """
+    timer = time.perf_counter
+    number = calibrate(operation, batch_time)
+    reference_number = calibrate(reference, batch_time)
+
+    samples = []
+    reference_samples = []
+    for _ in range(batches):
+        start = timer()
+        for _ in range(number):
+            operation()
+        samples.append((timer() - start) / number)
+        start = timer()
+        for _ in range(reference_number):
+            reference()
+        reference_samples.append((timer() - start) / reference_number)
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    median = statistics.median(samples)
+    return {
+        "ops_per_sec": 1 / median,
+        "p50_us": median * 1e6,
+        "p90_us": percentiles[89] * 1e6,
+        "p99_us": percentiles[98] * 1e6,
+        "reference_ops_per_sec": 1 / statistics.median(reference_samples),
+    }
+
+
+def environment() -> t.Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "uritemplate": uritemplate.__version__,
+    }
+
+
+def environment_changes(
+    current: t.Dict[str, str], saved: t.Dict[str, str]
+) -> t.List[str]:
+    """Return what differs between two environments and matters to results.
+
+    Python versions are compared as ``major.minor``, and the version of
+    uritemplate is ignored.
+    """
+    changes = []
+    for key in ("python", "implementation", "machine"):
+        value, previous = current.get(key, ""), saved.get(key, "")
+        if key == "python":
+            value = ".".join(value.split(".")[:2])
+            previous = ".".join(previous.split(".")[:2])
+        if value != previous:
+            changes.append(
+                f"{key} {previous or 'unknown'} instead of {value}"
+            )
+    return changes
+
+
+def relative_speed(
+    result: t.Dict[str, float], previous: t.Dict[str, float]
+) -> float:
+    """Return how many times faster a benchmark is than in the baseline.
+
+    The speed of the reference operation next to it is taken out.
+    """
+    ratio = result["ops_per_sec"] / previous["ops_per_sec"]
+    if "reference_ops_per_sec" in previous:
+        ratio /= (
+            result["reference_ops_per_sec"]
+            / previous["reference_ops_per_sec"]
+        )
+    return ratio
+
+
+def compare(
+    results: t.Dict[str, t.Dict[str, float]],
+    baseline: t.Dict[str, t.Dict[str, float]],
+    tolerance: float,
+) -> t.List[str]:
+    """Return the names of the benchmarks that got slower than allowed."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if relative_speed(result, previous) < 1 - tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def report(
+    results: t.Dict[str, t.Dict[str, float]],
+    baseline: t.Dict[str, t.Dict[str, float]],
+) -> None:
+    width = max(len(name) for name in results)
+    print(
+        f"{'benchmark':<{width}}  {'ops/sec':>12}  {'p50 us':>9}  "
+        f"{'p90 us':>9}  {'p99 us':>9}  {'change':>8}"
+    )
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            ratio = relative_speed(result, baseline[name])
+            change = f"{ratio - 1:+.1%}"
+        print(
+            f"{name:<{width}}  {result['ops_per_sec']:>12,.0f}  "
+            f"{result['p50_us']:>9.2f}  {result['p90_us']:>9.2f}  "
+            f"{result['p99_us']:>9.2f}  {change:>8}"
+        )
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="only run benchmarks whose name contains this string",
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="baseline JSON to compare against"
+    )
+    parser.add_argument(
+        "--save", metavar="PATH", help="write the results as a baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.4,
+        help="allowed slowdown against the baseline (default: 0.4)",
+    )
+    parser.add_argument(
+        "--batches",
+        type=int,
+        default=50,
+        help="number of timed batches per benchmark (default: 50)",
+    )
+    parser.add_argument(
+        "--batch-time",
+        type=float,
+        default=0.002,
+        help="minimum seconds per batch (default: 0.002)",
+    )
+    args = parser.parse_args(argv)
+
+    saved: t.Dict[str, t.Any] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            saved = json.load(baseline_file)
+    baseline: t.Dict[str, t.Dict[str, float]] = saved.get("results", {})
+
+    results = {}
+    for name, operation in benchmarks().items():
+        if args.filter in name:
+            results[name] = measure(operation, args.batches, args.batch_time)
+    report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as baseline_file:
+            json.dump(
+                {"environment": environment(), "results": results},
+                baseline_file,
+                indent=2,
+                sort_keys=True,
+            )
+            baseline_file.write("\n")
+
+    changes = environment_changes(environment(), saved.get("environment", {}))
+    if saved and changes:
+        print(
+            "\nThe baseline was saved in another environment, so it was not "
+            "checked for regressions:",
+            *changes,
+            sep="\n  ",
+        )
+        return 2
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) more than "
+            f"{args.tolerance:.0%} slower than the baseline:",
+            *regressions,
+            sep="\n  ",
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ import os.path
 import typing as t
 
 import uritemplate
+from uritemplate import codegen
 
 
 def fixture_file_path(filename: str) -> str:
@@ -58,6 +59,10 @@ class FixtureMixin:
                 f"and got {expanded!r} but expected one of "
                 f"{expected_templates!r}"
             )
+            parts = uritemplate.URITemplate(template).expand_parts(variables)
+            assert "".join(parts) == expanded  # nosec
+            compiled = codegen.compile_expand(template)
+            assert compiled(variables) == expanded  # nosec
 
 
 class TestSpecExamples(FixtureMixin):
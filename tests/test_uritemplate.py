@@ -1,10 +1,31 @@
 import collections.abc
+import copy
+import io
+import marshal
+import os
+import pickle
+import stat
+import tempfile
+import threading
 import typing as t
 import unittest
+import unittest.mock
+import urllib.parse
 
+from uritemplate import TemplateRouter
 from uritemplate import URITemplate
+from uritemplate import __main__ as cli
+from uritemplate import api
+from uritemplate import bulk
+from uritemplate import cache
+from uritemplate import codegen
+from uritemplate import dumps
 from uritemplate import expand
+from uritemplate import loads
+from uritemplate import orderedset
 from uritemplate import partial
+from uritemplate import registry
+from uritemplate import stats
 from uritemplate import variable
 from uritemplate import variables
 
@@ -570,6 +591,23 @@ class TestURITemplate(unittest.TestCase, metaclass=RFCTemplateExamples):
             "foo=bar&foo=bogus",
         )
 
+    def test_operator_is_bound(self) -> None:
+        var = variable.URIVariable("/path")
+        self.assertIs(var.operator, variable.Operator.path_segment)
+        self.assertEqual(var._expand({"path": "a/b"}), "/a%2Fb")
+        var.operator = variable.Operator.fragment
+        self.assertEqual(var._expand({"path": "a/b"}), "#a/b")
+        for operator in variable.Operator:
+            var.operator = operator
+            value = ["a b", "c/d"]
+            self.assertEqual(
+                var._quote("a/b%20"), operator.quote("a/b%20"), operator
+            )
+            self.assertEqual(var._prefix, operator.variable_prefix())
+            self.assertEqual(var._separator, operator.expansion_separator())
+            self.assertEqual(var._safe, operator.reserved_characters())
+            self.assertIsInstance(var._expand({"path": value}), str)
+
     def test_string_expansion(self) -> None:
         t = URITemplate("{foo}")
         self.assertEqual(
@@ -589,6 +627,619 @@ class TestURITemplate(unittest.TestCase, metaclass=RFCTemplateExamples):
         t.expand(args, key=1)
         self.assertEqual(args, {})
 
+    def test_compact_representation(self) -> None:
+        t = URITemplate("{/list*,var:3}{?x=1}")
+        self.assertFalse(hasattr(t, "__dict__"))
+        self.assertFalse(hasattr(t.variables[0], "__dict__"))
+        self.assertEqual(
+            t.variables[0].variables,
+            (
+                variable.VarSpec("list", True, None),
+                variable.VarSpec("var", False, 3),
+            ),
+        )
+        self.assertEqual(t.variables[0].variable_names, ["list", "var"])
+        self.assertEqual(t.variables[0].defaults, {})
+        self.assertEqual(t.variables[1].defaults, {"x": "1"})
+
+    def test_parsed_state_is_read_only(self) -> None:
+        template = URITemplate("{/a}{?b=1}")
+        self.assertIsInstance(template.variables, tuple)
+        names = template.variable_names
+        names.add("c")
+        self.assertEqual(list(template.variable_names), ["a", "b"])
+        defaults = t.cast(t.Dict[str, str], template.variables[1].defaults)
+        with self.assertRaises(TypeError):
+            defaults["b"] = "2"
+        self.assertEqual(template.partial(a="x", b="y").variables, ())
+        partial = URITemplate("{/a,b}").partial(a="x")
+        bound = t.cast(t.Dict[str, str], partial.variables[0]._bound)
+        with self.assertRaises(TypeError):
+            bound["b"] = "y"
+
+    def test_shared_between_threads(self) -> None:
+        template = URITemplate("{/user}{?page,q}", lazy=True)
+        expected = [f"/user{i}?page={i + 1}&q=a%20b" for i in range(50)]
+        results: t.Dict[int, t.List[str]] = {}
+
+        def expand(thread: int) -> None:
+            results[thread] = [
+                template.expand(user=f"user{i}", page=i + 1, q="a b")
+                for i in range(50)
+            ]
+
+        threads = [
+            threading.Thread(target=expand, args=(i,)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {i: expected for i in range(8)})
+
+    def test_literals_around_expressions(self) -> None:
+        t = URITemplate("{a}/{}{b}/{a}?{")
+        self.assertEqual(len(t.variables), 3)
+        self.assertEqual(t.expand(a="x", b="y"), "x/{}y/x?{")
+        self.assertEqual(t.expand(a="x"), "x/{}/x?{")
+        self.assertEqual(t.partial(a="x"), URITemplate("x/{}{b}/x?{"))
+
+    def test_partial_binds_some_variables(self) -> None:
+        template = URITemplate("https://{host}/api{/version,user}{?q,page}")
+        bound = template.partial(host="example.com", version="v1", q="a b")
+        self.assertEqual(
+            str(bound), "https://example.com/api/v1{/user}?q=a%20b{&page}"
+        )
+        self.assertEqual(list(bound.variable_names), ["user", "page"])
+        self.assertEqual(
+            bound.expand(user="octocat", page=2, q="ignored"),
+            "https://example.com/api/v1/octocat?q=a%20b&page=2",
+        )
+        self.assertEqual(bound.expand(), "https://example.com/api/v1?q=a%20b")
+        self.assertEqual(
+            bound.partial(page=2).partial(user="octocat"),
+            URITemplate("https://example.com/api/v1/octocat?q=a%20b&page=2"),
+        )
+        self.assertEqual(
+            bound.match("https://example.com/api/v1/octocat?q=a%20b&page=2"),
+            {"user": "octocat", "page": "2"},
+        )
+        self.assertIsNone(
+            bound.match("https://example.com/api/v1/octocat?q=b&page=2")
+        )
+        self.assertEqual(
+            loads(dumps(bound)).expand(user="octocat"),
+            bound.expand(user="octocat"),
+        )
+        self.assertEqual(
+            codegen.compile_expand(bound)(user="octocat"),
+            bound.expand(user="octocat"),
+        )
+
+    def test_partial_keeps_order(self) -> None:
+        values: variable.VariableValueMapping = {
+            "a": "1",
+            "b": ["x", "y"],
+            "c": {"k": "v"},
+        }
+        for operator in ("", "+", "#", ".", "/", ";", "?", "&"):
+            template = URITemplate("{%sa,b*,c}" % operator)
+            expected = template.expand(values)
+            for name, value in values.items():
+                rest = {k: v for k, v in values.items() if k != name}
+                bound = template.partial({name: value})
+                self.assertEqual(bound.expand(rest), expected, operator)
+                if operator not in ("+", "#", "?"):
+                    self.assertEqual(
+                        URITemplate(str(bound)).expand(rest), expected
+                    )
+
+    def test_partial_matches_its_expansion(self) -> None:
+        for operator in ("", "+", "#", ".", "/", ";", "?", "&"):
+            template = URITemplate(f"{{{operator}a,b,c}}")
+            for name in "abc":
+                bound = template.partial({name: "x"})
+                values = {n: "y" for n in "abc" if n != name}
+                with self.subTest(operator=operator, name=name):
+                    self.assertEqual(bound.match(bound.expand()), {})
+                    self.assertEqual(
+                        bound.match(bound.expand(values)), values
+                    )
+                    self.assertIsNone(bound.match(template.expand(values)))
+
+    def test_lazy(self) -> None:
+        uri = "https://api.github.com/users{/user}{?page}"
+        eager = URITemplate(uri)
+        uses: t.List[t.Callable[[URITemplate], t.Any]] = [
+            lambda template: template.expand(user="octocat"),
+            lambda template: template.partial(user="octocat"),
+            lambda template: template.variables,
+            lambda template: template.variable_names,
+            lambda template: template.match(
+                "https://api.github.com/users/octocat"
+            ),
+            lambda template: template.expand_many([{"user": "octocat"}]),
+            lambda template: template.expand_columns({"user": ["octocat"]}),
+        ]
+        for use in uses:
+            lazy = URITemplate(uri, lazy=True)
+            self.assertIsNone(lazy._segments)
+            self.assertEqual(lazy, eager)
+            self.assertEqual(hash(lazy), hash(eager))
+            self.assertEqual(str(lazy), uri)
+            self.assertIsNone(lazy._segments)
+            self.assertEqual(repr(use(lazy)), repr(use(eager)))
+            self.assertIsNotNone(lazy._segments)
+        self.assertEqual(URITemplate("/", lazy=True).expand(), "/")
+
+    def test_expand_from_providers(self) -> None:
+        template = URITemplate("/users{/login}/repos{/login,repo}{?page}")
+        values = {"login": "octocat", "repo": "hello world", "other": "x"}
+        expected = "/users/octocat/repos/octocat/hello%20world"
+
+        class Attributes:
+            login = "octocat"
+            repo = "hello world"
+
+        class Items:
+            def __getitem__(self, name: str) -> str:
+                return values[name]
+
+        asked: t.List[str] = []
+
+        def lookup(name: str) -> t.Optional[str]:
+            asked.append(name)
+            return values.get(name)
+
+        for provider in (values, Attributes(), Items(), lookup):
+            self.assertEqual(template.expand(provider), expected)
+            self.assertEqual(
+                template.expand(provider, page=2), expected + "?page=2"
+            )
+            self.assertEqual(
+                template.expand(provider, repo=None, page=2),
+                "/users/octocat/repos/octocat?page=2",
+            )
+            self.assertEqual(
+                template.partial(provider),
+                URITemplate(expected + "{?page}"),
+            )
+            self.assertEqual(
+                api.expand(str(template), provider, page=2),
+                expected + "?page=2",
+            )
+        # Every variable is looked up once, and only overrides skip it.
+        self.assertEqual(
+            asked,
+            ["login", "repo", "page"]
+            + ["login", "repo"]
+            + ["login"]
+            + ["login", "repo", "page"]
+            + ["login", "repo"],
+        )
+
+    def test_expand_bytes(self) -> None:
+        template = URITemplate("/caf\u00e9{/name}{?q,r}{#frag}")
+        self.assertEqual(
+            template.expand_bytes(
+                name="a b", q=b"caf\xc3\xa9", r=b"\xff", frag=b"%41/\xff"
+            ),
+            b"/caf%C3%A9/a%20b?q=caf%C3%A9&r=%FF#%41/%FF",
+        )
+        self.assertEqual(
+            URITemplate("{/x}").expand_bytes({"x": "caf\u00e9"}),
+            b"/caf%C3%A9",
+        )
+        self.assertIsInstance(URITemplate("/").expand_bytes(), bytes)
+
+    def test_expand_parts(self) -> None:
+        template = URITemplate("/repos{/owner,repo}{?q*}{&x}#top")
+        self.assertEqual(
+            list(template.expand_parts(owner="octo cat", q=["a", "b"])),
+            ["/repos", "/", "octo%20cat", "?", "q=a", "&", "q=b", "#top"],
+        )
+        self.assertEqual(
+            list(template.expand_parts({"repo": "r"}, x="")),
+            ["/repos", "/", "r", "&", "x=", "#top"],
+        )
+        self.assertEqual(list(URITemplate("{x}").expand_parts()), [])
+
+    def test_expand_parts_of_large_values(self) -> None:
+        q = [str(i) for i in range(100_000)]
+        parts = list(URITemplate("/s{?q*}").expand_parts(q=q))
+        self.assertEqual(len(parts), 2 * len(q) + 1)
+        self.assertEqual(max(len(part) for part in parts), len("q=99999"))
+        parts = list(URITemplate("{/d}").expand_parts(d=dict(zip(q, q))))
+        self.assertEqual(parts[:4], ["/", "0,0", ",", "1,1"])
+
+    def test_expand_parts_joins_to_expand(self) -> None:
+        for name in dir(RFCTemplateExamples):
+            if not name.startswith("level"):
+                continue
+            for template, case in getattr(RFCTemplateExamples, name).items():
+                with self.subTest(template=template):
+                    parts = URITemplate(template).expand_parts(
+                        case["expansion"]
+                    )
+                    self.assertEqual("".join(parts), case["expected"])
+
+    def test_expand_into(self) -> None:
+        template = URITemplate("/search{?q*}")
+        q = [str(i) for i in range(1000)]
+        expected = template.expand(q=q)
+        parts: t.List[str] = []
+        template.expand_into(parts, q=q)
+        self.assertEqual("".join(parts), expected)
+        buffer = io.StringIO()
+        template.expand_into(buffer, {"q": q})
+        self.assertEqual(buffer.getvalue(), expected)
+        written: t.List[str] = []
+        template.expand_into(written.append, q=q)
+        self.assertEqual(written, parts)
+
+    def test_expand_many(self) -> None:
+        template = URITemplate(
+            "https://api.github.com/users{/user}{?page,q*}"
+        )
+        var_dicts: t.List[variable.VariableValueMapping] = [
+            {"user": "octocat", "page": 1},
+            {"user": "octocat", "page": 1.0},
+            {"user": "octocat", "page": True},
+            {"user": "octocat", "page": 1},
+            {"user": "hubot", "q": {"a": "b"}},
+            {"user": "hubot", "q": {"a": "c"}},
+            {},
+        ]
+        expected = [template.expand(d) for d in var_dicts]
+        self.assertEqual(template.expand_many(var_dicts), expected)
+        self.assertEqual(
+            list(template.iter_expand(iter(var_dicts))), expected
+        )
+        self.assertEqual(
+            expected[1], "https://api.github.com/users/octocat?page=1.0"
+        )
+
+        u = URITemplate("https://api.github.com")
+        self.assertEqual(u.expand_many([{}, {"a": 1}]), [u.uri, u.uri])
+
+    def test_expand_columns(self) -> None:
+        class Array:
+            def __init__(self, *values: int) -> None:
+                self.values = values
+
+            def __iter__(self) -> t.Iterator[int]:
+                raise AssertionError("tolist() should be used")
+
+            def tolist(self) -> t.List[int]:
+                return list(self.values)
+
+        template = URITemplate(
+            "100%/users{/user,repo}{?page}{&q*}{#frag=top}"
+        )
+        columns: t.Dict[str, t.Iterable[variable.VariableValue]] = {
+            "user": ["octocat", "hubot", "octocat", None],
+            "repo": ("hello world", "", "hello world", "x"),
+            "page": range(4),
+            "q": [{"a": "b"}, {}, t.cast(t.Any, [("c", "d")]), None],
+        }
+        rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        self.assertEqual(
+            template.expand_columns(columns),
+            [template.expand(row) for row in rows],
+        )
+        self.assertEqual(
+            template.expand_columns({"page": Array(1, 1, 2)}),
+            [
+                "100%/users?page=1#top",
+                "100%/users?page=1#top",
+                "100%/users?page=2#top",
+            ],
+        )
+        self.assertEqual(template.expand_columns({}), [])
+        self.assertRaises(
+            ValueError, template.expand_columns, {"user": [], "page": [1]}
+        )
+        self.assertRaises(TypeError, template.expand_columns, {"user": "a"})
+
+
+class TestCodegen(unittest.TestCase):
+    def test_compile_expand(self) -> None:
+        templates = [
+            "https://api.github.com/repos{/owner,repo}/issues{?state,page}",
+            "it's {a}\\{b}\"{c",
+            "{x=1}{+path:3}{#frag}{.a,b}{;a,b,x=2}{&empty}",
+            "no variables {} at all",
+        ]
+        inputs: t.List[variable.VariableValueMapping] = [
+            {},
+            {"owner": "octo cat", "repo": "hello-world", "page": 2},
+            {"a": "", "b": "b", "x": "", "empty": ""},
+            {"a": ["x", "y"], "b": {"k": "v"}, "path": "/a/b", "x": None},
+            {"frag": "%41 b", "state": "caf\u00e9", "c": "c"},
+        ]
+        for uri in templates:
+            template = URITemplate(uri)
+            compiled = codegen.compile_expand(template)
+            for var_dict in inputs:
+                self.assertEqual(
+                    compiled(var_dict), template.expand(var_dict), uri
+                )
+            self.assertEqual(
+                compiled({"a": "1"}, b="2", a="3"),
+                template.expand({"a": "1"}, b="2", a="3"),
+            )
+            self.assertEqual(compiled(), template.expand())
+
+    def test_compile_expand_accepts_providers(self) -> None:
+        compiled = codegen.compile_expand("/users{/login}{?page}")
+
+        class User:
+            login = "octocat"
+
+        self.assertEqual(compiled(User()), "/users/octocat")
+        self.assertEqual(compiled(User(), page=2), "/users/octocat?page=2")
+        self.assertEqual(compiled(login="hubot"), "/users/hubot")
+
+
+class TestMatch(unittest.TestCase):
+    def test_match(self) -> None:
+        matches: t.List[t.Tuple[str, str, t.Dict[str, t.Any]]] = [
+            (
+                "https://api.github.com/users{/user}{?page}",
+                "https://api.github.com/users/octocat?page=2",
+                {"user": "octocat", "page": "2"},
+            ),
+            (
+                "https://api.github.com/users{/user}{?page}",
+                "https://api.github.com/users",
+                {},
+            ),
+            ("{/user}{/repo}", "/a%2Fb", {"user": "a/b"}),
+            ("X{.x,y}", "X.1024.768", {"x": "1024", "y": "768"}),
+            ("X{.var}", "X.1.0", {"var": "1.0"}),
+            ("{a}", "100%25", {"a": "100%"}),
+            ("{?a}{&b}", "&b=1", {"b": "1"}),
+            ("{/list*}", "/red/green", {"list": ["red", "green"]}),
+            ("{/list}", "/red,green", {"list": ["red", "green"]}),
+            (
+                "{/keys*}",
+                "/semi=%3B/dot=.",
+                {"keys": {"semi": ";", "dot": "."}},
+            ),
+            (
+                "{;x,empty,list*}",
+                ";x=1024;empty;list=red;list=green",
+                {"x": "1024", "empty": "", "list": ["red", "green"]},
+            ),
+            (
+                "/search{?q,page}",
+                "/search?page=2&q=URI%20Templates",
+                {"q": "URI Templates", "page": "2"},
+            ),
+            (
+                "/search{?q}{&page}",
+                "/search?page=2&q=a",
+                {"q": "a", "page": "2"},
+            ),
+            (
+                "{?keys*}",
+                "?semi=%3B&dot=.",
+                {"keys": {"semi": ";", "dot": "."}},
+            ),
+            ("{+path}/here", "/foo/bar/here", {"path": "/foo/bar"}),
+            (
+                "{+base}{?q}",
+                "http://x/y?q=1",
+                {"base": "http://x/y", "q": "1"},
+            ),
+            ("X{#frag}", "X#a/b!c", {"frag": "a/b!c"}),
+            ("{/var:1,var}", "/v/value", {"var": "value"}),
+            ("{/var:1}", "/v", {"var": "v"}),
+        ]
+        for template, uri, expected in matches:
+            with self.subTest(template=template, uri=uri):
+                self.assertEqual(URITemplate(template).match(uri), expected)
+
+    def test_no_match(self) -> None:
+        no_matches = [
+            ("https://api.github.com/users{/user}", "https://example.com"),
+            ("{/user}", "/a/b"),
+            ("/search{?q}", "/search?q=1&other=2"),
+            ("/search{?q}", "/search?q=1&q=2"),
+            ("{/user,repo}", "/a/b/c"),
+            ("{/var:1,var}", "/v/value/other"),
+            ("{/a}{/b}{/a}", "/x/y/z"),
+            ("/x{?a}", "/x&a=1"),
+            ("{?a,b}", "&a=1&b=2"),
+            ("?{?c*}", "?&a=a.b&c=?"),
+            ("{a}", "%"),
+            ("{a}", "%zz"),
+            ("{+a}", "a%2"),
+            ("{/a}{/b}", "/%4/1"),
+        ]
+        for template, uri in no_matches:
+            with self.subTest(template=template, uri=uri):
+                self.assertIsNone(URITemplate(template).match(uri))
+
+    def test_match_reverses_expand(self) -> None:
+        examples = [
+            (name, getattr(RFCTemplateExamples, name))
+            for name in dir(RFCTemplateExamples)
+            if name.startswith("level")
+            and "reserved" not in name
+            and "fragment" not in name
+        ]
+        for name, cases in examples:
+            for template, case in cases.items():
+                with self.subTest(template=template):
+                    t = URITemplate(template)
+                    matched = t.match(case["expected"])
+                    assert matched is not None
+                    # Dictionaries are expanded in sorted order, so compare
+                    # with a second round trip rather than the example.
+                    self.assertEqual(t.match(t.expand(matched)), matched)
+
+    def test_expand_reverses_match(self) -> None:
+        cases: t.List[t.Tuple[str, t.Dict[str, t.Any]]] = [
+            ("/r{.a,b}", {"a": "1.5", "b": "x"}),
+            ("/r{.a,b}", {"a": "x", "b": "1.5"}),
+            ("X{.x,y}", {"x": "1.0", "y": "2.0"}),
+            ("{a,b}", {"a": "", "b": "x"}),
+            ("{a,b}", {"a": "", "b": ""}),
+            ("{a,b,c}", {"a": "x", "b": "", "c": "y"}),
+            ("{/a,b}", {"a": "x", "b": "y.z"}),
+            ("{a,b}", {"a": ["x", "y"], "b": "z"}),
+            ("/files{/path*}{.ext}{?v}", {"path": ["a.b", "c"], "ext": "d"}),
+        ]
+        for text, values in cases:
+            with self.subTest(template=text, values=values):
+                template = URITemplate(text)
+                uri = template.expand(values)
+                matched = template.match(uri)
+                assert matched is not None
+                self.assertEqual(template.expand(matched), uri)
+
+    def test_no_match_of_long_uris(self) -> None:
+        # Backtracking through every way of splitting these between the
+        # expressions takes hours.
+        no_matches = [
+            ("{.a}{.b}{.c}{.d}!", ".a" * 2000),
+            ("{+a}{+b}{+c}/x", "a" * 2000),
+            ("/d{.x}{.y}{.z}", "/d" + ".a" * 2000 + "!"),
+            ("/files{/path*}{.ext}{?v}", "/files" + "/a.b" * 2000 + "!"),
+            ("{a}-{b}-{c}-{d}!", "a-" * 2000),
+        ]
+        for template, uri in no_matches:
+            with self.subTest(template=template):
+                self.assertIsNone(URITemplate(template).match(uri))
+
+    def test_match_long_uris(self) -> None:
+        labels = URITemplate("{.a}{.b}{.c}{.d}!")
+        self.assertEqual(
+            labels.match(".x" * 5000 + "!"), {"a": "x" + ".x" * 4999}
+        )
+        reserved = URITemplate("{+a}{+b}{+c}/x")
+        self.assertEqual(reserved.match("a" * 5000 + "/x"), {"c": "a" * 5000})
+
+
+class TestTemplateRouter(unittest.TestCase):
+    templates = [
+        "https://api.github.com/users{/user}",
+        "https://api.github.com/users{/user}/repos{?page}",
+        "https://api.github.com/users/octocat",
+        "https://api.github.com/repos{/owner,repo}",
+        "https://api.github.com/repos{/owner}/issues",
+        "{+base}/fallback",
+    ]
+
+    def test_match(self) -> None:
+        router = TemplateRouter(self.templates)
+        matches = [
+            (
+                "https://api.github.com/users/hubot/repos?page=2",
+                self.templates[1],
+                {"user": "hubot", "page": "2"},
+            ),
+            (
+                "https://api.github.com/users/hubot",
+                self.templates[0],
+                {"user": "hubot"},
+            ),
+            ("https://api.github.com/users/octocat", self.templates[2], {}),
+            (
+                "https://api.github.com/repos/octocat/issues",
+                self.templates[4],
+                {"owner": "octocat"},
+            ),
+            (
+                "https://api.github.com/repos/octocat/hello",
+                self.templates[3],
+                {"owner": "octocat", "repo": "hello"},
+            ),
+            (
+                "https://example.com/fallback",
+                self.templates[5],
+                {"base": "https://example.com"},
+            ),
+        ]
+        for uri, template, expected in matches:
+            with self.subTest(uri=uri):
+                self.assertEqual(
+                    router.match(uri), (URITemplate(template), expected)
+                )
+        self.assertIsNone(router.match("https://api.github.com/gists"))
+
+    def test_match_all(self) -> None:
+        router = TemplateRouter(self.templates)
+        self.assertEqual(
+            [m.template for m in router.match_all(self.templates[2])],
+            [URITemplate(self.templates[2]), URITemplate(self.templates[0])],
+        )
+        router = TemplateRouter(["?{?c*}", "{/a}"])
+        self.assertEqual(list(router.match_all("?&a=a.b&c=?")), [])
+
+    def test_add(self) -> None:
+        router = TemplateRouter()
+        for template in self.templates + self.templates:
+            router.add(template)
+        self.assertEqual(len(router), len(self.templates))
+        self.assertEqual(
+            list(router), [URITemplate(uri) for uri in self.templates]
+        )
+        self.assertIn(self.templates[0], router)
+        self.assertNotIn("{/other}", router)
+
+    def test_match_tries_few_templates(self) -> None:
+        text = (
+            "https://api.example.com/repos/{{owner}}/{{repo}}/res{}{{?page}}"
+        )
+        for count in (40, 4000):
+            router = TemplateRouter(text.format(i) for i in range(count))
+            with unittest.mock.patch.object(
+                URITemplate,
+                "match",
+                autospec=True,
+                side_effect=URITemplate.match,
+            ) as match:
+                found = router.match(
+                    f"https://api.example.com/repos/a/b/res{count - 1}?page=2"
+                )
+                self.assertIsNone(
+                    router.match("https://api.example.com/repos/a/b/resx")
+                )
+            assert found is not None
+            self.assertEqual(
+                found.template, URITemplate(text.format(count - 1))
+            )
+            with self.subTest(count=count):
+                self.assertLessEqual(match.call_count, 2)
+
+    def test_match_literals_after_expressions(self) -> None:
+        templates = [
+            "/repos/{owner}/{repo}/issues",
+            "/repos/{owner}/{repo}/pulls",
+            "/users/{user}{/tab}",
+            "/repos{/path*}/raw",
+            "/search{?q}{&page}",
+        ]
+        router = TemplateRouter(templates)
+        matches = [
+            ("/repos/a/b/pulls", 1, {"owner": "a", "repo": "b"}),
+            ("/repos/a/b/issues", 0, {"owner": "a", "repo": "b"}),
+            ("/users/a/stars", 2, {"user": "a", "tab": "stars"}),
+            ("/repos/a/b/c/raw", 3, {"path": ["a", "b", "c"]}),
+            ("/repos/raw", 3, {}),
+            ("/search?q=a&page=2", 4, {"q": "a", "page": "2"}),
+            ("/search", 4, {}),
+        ]
+        for uri, index, expected in matches:
+            with self.subTest(uri=uri):
+                self.assertEqual(
+                    router.match(uri),
+                    (URITemplate(templates[index]), expected),
+                )
+        self.assertIsNone(router.match("/repos/a/b/wiki"))
+
 
 class TestVariableModule(unittest.TestCase):
     def test_is_list_of_tuples(self) -> None:
@@ -612,6 +1263,86 @@ class TestVariableModule(unittest.TestCase):
         d = dict(a_list)
         self.assertEqual(variable.dict_test(d), True)
 
+    def test_quote(self) -> None:
+        reserved = variable._RESERVED_CHARACTERS
+        for value in ["", "abc", "a b", "100%", "Grüner Weg", "ä/€?#[]@!"]:
+            for safe in ["", reserved, reserved + "%"]:
+                with self.subTest(value=value, safe=safe):
+                    expected = urllib.parse.quote(value.encode(), safe)
+                    self.assertEqual(variable.quote(value, safe), expected)
+                    self.assertEqual(
+                        variable.quote(value.encode(), safe), expected
+                    )
+        self.assertEqual(variable.quote(1.5, ""), "1.5")
+
+    def test_quote_cache(self) -> None:
+        self.addCleanup(variable.set_quote_cache_size, 0)
+        variable.set_quote_cache_size(3)
+        template = URITemplate("{+a}{b}{?keys*}")
+        values: variable.VariableValueMapping = {
+            "a": "x y",
+            "b": "Grüner Weg",
+            "keys": {"k 1": "plain"},
+        }
+        uri = template.expand(values)
+        self.assertEqual(template.expand(values), uri)
+        self.assertEqual(uri, "x%20yGr%C3%BCner%20Weg?k%201=plain")
+        self.assertEqual(
+            variable.quote_cache_info(), cache.CacheInfo(3, 3, 0, 3, 3)
+        )
+        variable.set_quote_cache_size(1)
+        self.assertEqual(
+            variable.quote_cache_info(), cache.CacheInfo(3, 3, 2, 1, 1)
+        )
+
+        variable.quote_cache_clear()
+        self.assertEqual(variable.quote_cache_info().currsize, 0)
+        variable.set_quote_cache_size(0)
+        self.assertEqual(
+            variable.quote_cache_info(), cache.CacheInfo(0, 0, 0, 0, 0)
+        )
+        self.assertRaises(ValueError, variable.set_quote_cache_size, -1)
+
+    def test_reserved_quote_keeps_triplets(self) -> None:
+        quote = variable.Operator.reserved.quote
+        self.assertEqual(quote("a%20b c"), "a%20b%20c")
+        self.assertEqual(quote("100%"), "100%25")
+        self.assertEqual(quote("%zz%4ü"), "%25zz%254%C3%BC")
+        self.assertEqual(quote("/a?b=c#d"), "/a?b=c#d")
+
+
+class TestOrderedSet(unittest.TestCase):
+    def test_order(self) -> None:
+        s = orderedset.OrderedSet(["b", "a", "c", "a"])
+        s.add("d")
+        s.add("b")
+        s.discard("c")
+        s.discard("missing")
+        self.assertEqual(list(s), ["b", "a", "d"])
+        self.assertEqual(list(reversed(s)), ["d", "a", "b"])
+        self.assertEqual(len(s), 3)
+        self.assertIn("a", s)
+        self.assertNotIn("c", s)
+        self.assertEqual(repr(s), "OrderedSet(['b', 'a', 'd'])")
+        self.assertEqual(str(orderedset.OrderedSet()), "OrderedSet()")
+
+    def test_pop(self) -> None:
+        s = orderedset.OrderedSet("abc")
+        self.assertEqual(s.pop(), "c")
+        self.assertEqual(s.pop(last=False), "a")
+        self.assertEqual(s.pop(), "b")
+        self.assertRaises(KeyError, s.pop)
+
+    def test_equality(self) -> None:
+        s = orderedset.OrderedSet(["a", "b"])
+        self.assertEqual(s, orderedset.OrderedSet(["a", "b"]))
+        self.assertEqual(s, orderedset.OrderedSet(s))
+        self.assertNotEqual(s, orderedset.OrderedSet(["b", "a"]))
+        self.assertEqual(s, {"b", "a"})
+        self.assertNotEqual(s, {"a"})
+        self.assertNotEqual(s, ["a", "b"])
+        self.assertNotEqual(s, ["a", "z"])
+
 
 class TestAPI(unittest.TestCase):
     uri = "https://api.github.com{/endpoint}"
@@ -635,6 +1366,498 @@ class TestAPI(unittest.TestCase):
             variables(self.uri), URITemplate(self.uri).variable_names
         )
 
+    def test_template_cache(self) -> None:
+        api.cache_clear()
+        self.addCleanup(api.set_cache_size, api.DEFAULT_CACHE_SIZE)
+        expand(self.uri, endpoint="users")
+        expand(self.uri, endpoint="gists")
+        variables(self.uri)
+        info = api.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+        api.set_cache_size(1)
+        partial(self.uri + "{/other}")
+        self.assertEqual(api.cache_info().currsize, 1)
+        self.assertEqual(api.cache_info().maxsize, 1)
+
+        api.set_cache_size(0)
+        expand(self.uri, endpoint="users")
+        self.assertEqual(api.cache_info().currsize, 0)
+
+        api.cache_clear()
+        self.assertEqual(api.cache_info(), cache.CacheInfo(0, 0, 0, 0, 0))
+
+
+class TestSerialization(unittest.TestCase):
+    uris = [
+        "https://api.github.com/repos{/owner,repo}/issues{?state,page}",
+        "{x=1}{+path:3}{#frag}{.a,b*}{;a,b,x=2}{&empty}",
+        "no variables {} at all",
+        "",
+    ]
+    var_dict = {"owner": "octo cat", "a": ["x", "y"], "path": "/a/b"}
+
+    def assertSameTemplate(
+        self, loaded: URITemplate, template: URITemplate
+    ) -> None:
+        self.assertEqual(loaded, template)
+        self.assertEqual(loaded.variable_names, template.variable_names)
+        self.assertEqual(
+            [var.variables for var in loaded.variables],
+            [var.variables for var in template.variables],
+        )
+        self.assertEqual(
+            loaded.expand(self.var_dict), template.expand(self.var_dict)
+        )
+
+    def test_dumps_loads(self) -> None:
+        for uri in self.uris:
+            template = URITemplate(uri)
+            data = dumps(template)
+            self.assertIsInstance(data, bytes)
+            loaded = loads(data)
+            self.assertIsNotNone(loaded._segments)
+            self.assertSameTemplate(loaded, template)
+        self.assertEqual(
+            dumps(URITemplate("{a}", lazy=True)), dumps(URITemplate("{a}"))
+        )
+
+    def test_loads_rejects_other_data(self) -> None:
+        state = (0,) + URITemplate("{a}")._state()[1:]
+        for data in (b"", b"junk", marshal.dumps(state)):
+            with self.assertRaises(ValueError):
+                loads(data)
+
+    def test_loads_rejects_malformed_states(self) -> None:
+        version, uri, head, expressions = URITemplate("/{a,b}x")._state()
+        (var, tail), *_ = expressions
+
+        def binding(*bound: t.Any) -> t.Any:
+            return ((var[:4] + (bound,), tail),)
+
+        def replaced(index: int, value: t.Any) -> t.Any:
+            changed = list(var)
+            changed[index] = value
+            return ((tuple(changed), tail),)
+
+        malformed = [
+            (version, uri, None, ()),
+            (version, uri, head, ((var, None),)),
+            (version, None, head, expressions),
+            (version, uri, head, binding((2, "x"))),
+            (version, uri, head, binding((-1, "x"))),
+            (version, uri, head, binding((0, 1))),
+            (version, uri, head, replaced(0, None)),
+            (version, uri, head, replaced(1, "$")),
+            (version, uri, head, replaced(1, None)),
+            (version, uri, head, replaced(2, (("a", False, "3"),))),
+            (version, uri, head, replaced(2, (("a", False, 3.0),))),
+            (version, uri, head, replaced(2, (("a", False, True),))),
+            (version, uri, head, replaced(2, (("a", 0, None),))),
+            (version, uri, head, replaced(2, ((1, False, None),))),
+            (version, uri, head, replaced(2, (("a", False),))),
+            (version, uri, head, replaced(3, (("a", 1),))),
+            (version, uri, head),
+        ]
+        for state in malformed:
+            with self.subTest(state=state):
+                with self.assertRaises(ValueError):
+                    loads(marshal.dumps(state))
+
+    def test_pickle(self) -> None:
+        for uri in self.uris:
+            template = URITemplate(uri)
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                loaded = pickle.loads(pickle.dumps(template, protocol))
+                self.assertSameTemplate(loaded, template)
+            self.assertSameTemplate(copy.deepcopy(template), template)
+            var = variable.URIVariable("?a,b=1")
+            loaded_var = pickle.loads(pickle.dumps(var))
+            self.assertEqual(loaded_var._state(), var._state())
+
+    def test_pickle_lazy(self) -> None:
+        template = URITemplate(self.uris[0], lazy=True)
+        loaded = pickle.loads(pickle.dumps(template))
+        self.assertIsNone(loaded._segments)
+        self.assertSameTemplate(loaded, template)
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    templates: t.Dict[str, t.Union[URITemplate, str]] = {
+        "user_repos": (
+            "https://api.example.com/users{/user}/repos{?page,per_page}"
+        ),
+        "root": "https://api.example.com/",
+        "search": URITemplate("https://api.example.com/search{?q*}"),
+    }
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "templates.reg")
+
+    def test_registry(self) -> None:
+        registry.compile_registry(self.templates, self.path)
+        with registry.TemplateRegistry(self.path) as templates:
+            self.assertEqual(list(templates), list(self.templates))
+            self.assertEqual(len(templates), 3)
+            self.assertIn("root", templates)
+            self.assertNotIn("missing", templates)
+            self.assertEqual(templates._templates, {})
+            user_repos = templates["user_repos"]
+            self.assertEqual(list(templates._templates), ["user_repos"])
+            self.assertIs(templates["user_repos"], user_repos)
+            self.assertRaises(KeyError, lambda: templates["missing"])
+            self.assertEqual(
+                dict(templates),
+                {
+                    name: URITemplate(str(template))
+                    for name, template in self.templates.items()
+                },
+            )
+        self.assertEqual(
+            user_repos.expand(user="octocat", page=2),
+            "https://api.example.com/users/octocat/repos?page=2",
+        )
+
+    def test_rewrite(self) -> None:
+        registry.compile_registry(self.templates, self.path)
+        registry.compile_registry({}, self.path)
+        with registry.TemplateRegistry(self.path) as templates:
+            self.assertEqual(len(templates), 0)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.path)), ["templates.reg"]
+        )
+
+    @unittest.skipIf(os.name == "nt", "no POSIX permissions")
+    def test_permissions(self) -> None:
+        umask = os.umask(0o027)
+        self.addCleanup(os.umask, umask)
+        registry.compile_registry(self.templates, self.path)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+
+    def test_rejects_other_files(self) -> None:
+        registry.compile_registry(self.templates, self.path)
+        with open(self.path, "rb") as registry_file:
+            data = registry_file.read()
+        for other in (
+            b"",
+            b"short",
+            b"X" + data[1:],
+            data[:8] + b"\x09" + data[9:],
+            data[:16] + bytes(len(data) - 16),
+        ):
+            with open(self.path, "wb") as registry_file:
+                registry_file.write(other)
+            with self.assertRaises(ValueError):
+                registry.TemplateRegistry(self.path)
+
+
+class TestBulk(unittest.TestCase):
+    uri = "https://example.com/products{/id}{?page}"
+    inputs: t.List[variable.VariableValueMapping] = [
+        {"id": i, "page": i % 3 or None} for i in range(100)
+    ]
+
+    def test_expand_parallel(self) -> None:
+        expected = URITemplate(self.uri).expand_many(self.inputs)
+        for processes in (1, 2):
+            self.assertEqual(
+                list(
+                    bulk.expand_parallel(
+                        self.uri, self.inputs, processes, chunksize=7
+                    )
+                ),
+                expected,
+            )
+        unordered = bulk.expand_parallel(
+            URITemplate(self.uri).partial(page=1),
+            iter(self.inputs),
+            processes=2,
+            chunksize=10,
+            ordered=False,
+        )
+        self.assertEqual(
+            sorted(unordered),
+            sorted(
+                URITemplate(self.uri).expand(var, page=1)
+                for var in self.inputs
+            ),
+        )
+        self.assertEqual(list(bulk.expand_parallel(self.uri, [], 2)), [])
+
+    def test_shards(self) -> None:
+        shards = [
+            list(
+                bulk.expand_parallel(
+                    self.uri, self.inputs, processes=1, shard=(index, 3)
+                )
+            )
+            for index in range(3)
+        ]
+        self.assertEqual([len(shard) for shard in shards], [34, 33, 33])
+        self.assertEqual(
+            shards[1],
+            URITemplate(self.uri).expand_many(self.inputs[1::3]),
+        )
+
+    def test_rejects_bad_arguments(self) -> None:
+        for kwargs in (
+            {"processes": 0},
+            {"chunksize": 0},
+            {"shard": (3, 3)},
+            {"shard": (-1, 3)},
+        ):
+            with self.assertRaises(ValueError):
+                bulk.expand_parallel(self.uri, self.inputs, **kwargs)
+
+
+class TestCommandLine(unittest.TestCase):
+    uri = "https://api.github.com/users{/user}{?page}"
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input = os.path.join(directory.name, "input")
+        self.output = os.path.join(directory.name, "output")
+
+    def run_cli(self, *args: str, lines: str = "") -> t.Tuple[int, str]:
+        with open(self.input, "w", encoding="utf-8") as input_file:
+            input_file.write(lines)
+        status = cli.main(
+            [*args, "--input", self.input, "--output", self.output]
+        )
+        with open(self.output, encoding="utf-8") as output_file:
+            return status, output_file.read()
+
+    def test_expand(self) -> None:
+        lines = '{"user": "octocat", "page": 2}\n\n{"user": "a b"}\n'
+        expected = (
+            "https://api.github.com/users/octocat?page=2\n"
+            "https://api.github.com/users/a%20b\n"
+        )
+        for processes in ("1", "2"):
+            self.assertEqual(
+                self.run_cli(
+                    "expand",
+                    self.uri,
+                    "-p",
+                    processes,
+                    "--chunksize",
+                    "1",
+                    lines=lines,
+                ),
+                (0, expected),
+            )
+
+    def test_variables(self) -> None:
+        self.assertEqual(
+            self.run_cli("variables", self.uri), (0, "user\npage\n")
+        )
+
+    def test_match(self) -> None:
+        lines = (
+            "https://api.github.com/users/octocat?page=2\n"
+            "https://example.com/\n"
+        )
+        self.assertEqual(
+            self.run_cli("match", self.uri, lines=lines),
+            (0, '{"user": "octocat", "page": "2"}\nnull\n'),
+        )
+
+    def test_bad_input(self) -> None:
+        stderr = io.StringIO()
+        with unittest.mock.patch("sys.stderr", stderr):
+            for lines in ('{"user": "a"}\n[1]\n', "{\n"):
+                status, _ = self.run_cli("expand", self.uri, lines=lines)
+                self.assertEqual(status, 1)
+        self.assertIn("line 2: expected a JSON object", stderr.getvalue())
+        self.assertIn("line 1: invalid JSON", stderr.getvalue())
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self) -> None:
+        stats.reset()
+        self.addCleanup(stats.reset)
+        self.addCleanup(stats.disable)
+
+    def test_disabled(self) -> None:
+        expand = URITemplate.expand
+        URITemplate("{/a}").expand(a=1)
+        snapshot = stats.snapshot()
+        self.assertFalse(snapshot["enabled"])
+        self.assertEqual(snapshot["templates"], {})
+        self.assertEqual(snapshot["latency"], {})
+        stats.enable()
+        stats.disable()
+        self.assertIs(URITemplate.expand, expand)
+
+    def test_counts(self) -> None:
+        none = dict.fromkeys(stats._OPERATIONS, 0)
+        stats.enable()
+        stats.enable()
+        self.assertTrue(stats.is_enabled())
+        template = URITemplate("{/a}{?b}")
+        lazy = URITemplate("{+c}", lazy=True)
+        self.assertEqual(template.expand(a=1), "/1")
+        self.assertEqual(template.expand({"b": 2}), "?b=2")
+        self.assertEqual(str(template.partial(a=1)), "/1{?b}")
+        self.assertEqual(lazy.expand(c="/"), "/")
+        snapshot = stats.snapshot()
+        self.assertEqual(
+            snapshot["templates"],
+            {
+                "{/a}{?b}": dict(none, parse=1, expand=2, partial=1),
+                "{+c}": dict(none, parse=1, expand=1),
+            },
+        )
+        self.assertEqual(snapshot["latency"]["expand"]["count"], 3)
+        self.assertEqual(
+            sum(snapshot["latency"]["expand"]["buckets_us"].values()), 3
+        )
+        self.assertEqual(snapshot["latency"]["partial"]["count"], 1)
+        self.assertIn("hits", snapshot["caches"]["templates"])
+        self.assertIn("misses", snapshot["caches"]["quoted_values"])
+
+        stats.disable()
+        template.expand(a=1)
+        self.assertEqual(stats.snapshot()["templates"], snapshot["templates"])
+        stats.reset()
+        self.assertEqual(stats.snapshot()["templates"], {})
+
+    def test_counts_every_expansion_once(self) -> None:
+        template = URITemplate("{/a}")
+        stats.enable()
+        expand = codegen.compile_expand(template)
+        self.assertEqual(template.expand_bytes(a=1), b"/1")
+        self.assertEqual("".join(template.expand_parts(a=1)), "/1")
+        template.expand_into([], a=1)
+        self.assertEqual(
+            template.expand_many([{"a": 1}, {"a": 2}]), ["/1", "/2"]
+        )
+        self.assertEqual(list(template.iter_expand([{"a": 1}])), ["/1"])
+        self.assertEqual(template.expand_columns({"a": [1, 2]}), ["/1", "/2"])
+        self.assertEqual(expand(a=1), "/1")
+        self.assertEqual(expand(a=2), "/2")
+        counts = stats.snapshot()["templates"]["{/a}"]
+        self.assertEqual(
+            counts,
+            dict(
+                counts,
+                expand=0,
+                expand_bytes=1,
+                expand_parts=2,
+                expand_many=2,
+                expand_columns=1,
+                compiled=2,
+            ),
+        )
+        latency = stats.snapshot()["latency"]
+        self.assertEqual(latency["expand_many"]["count"], 2)
+        stats.disable()
+        self.assertEqual(expand(a=3), "/3")
+        self.assertEqual(stats.snapshot()["templates"]["{/a}"], counts)
+
+    def test_counts_partials_as_their_template(self) -> None:
+        stats.enable()
+        template = URITemplate("{/a}{?b}")
+        for a in range(10):
+            template.partial(a=a).partial(b=a).expand()
+        self.assertEqual(list(stats.snapshot()["templates"]), ["{/a}{?b}"])
+        self.assertEqual(
+            stats.snapshot()["templates"]["{/a}{?b}"]["partial"], 20
+        )
+        self.assertEqual(
+            stats.snapshot()["templates"]["{/a}{?b}"]["expand"], 10
+        )
+
+    def test_counts_few_templates(self) -> None:
+        stats.enable()
+        with unittest.mock.patch.object(stats, "MAX_TEMPLATES", 2):
+            for a in range(5):
+                URITemplate(f"/{a}").expand()
+        templates = stats.snapshot()["templates"]
+        self.assertEqual(list(templates), ["/0", "/1", stats.OTHER_TEMPLATES])
+        self.assertEqual(templates[stats.OTHER_TEMPLATES]["expand"], 3)
+
+    def test_histogram(self) -> None:
+        histogram = stats._Histogram()
+        for seconds in (0.0000005, 0.0000015, 0.000003, 3600.0):
+            histogram.add(seconds)
+        buckets = histogram.as_dict()["buckets_us"]
+        self.assertEqual(buckets["1"], 1)
+        self.assertEqual(buckets["2"], 1)
+        self.assertEqual(buckets["4"], 1)
+        self.assertEqual(buckets["+Inf"], 1)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        lru: cache.LRUCache[str, str] = cache.LRUCache(2)
+        lru.get_or_create("a", str.upper)
+        lru.get_or_create("b", str.upper)
+        self.assertEqual(lru.get_or_create("a", str.lower), "A")
+        lru.get_or_create("c", str.upper)
+        self.assertIn("a", lru)
+        self.assertNotIn("b", lru)
+        self.assertEqual(len(lru), 2)
+
+    def test_rejects_negative_size(self) -> None:
+        self.assertRaises(ValueError, cache.LRUCache, -1)
+
+
+class TestShardedLRUCache(unittest.TestCase):
+    def test_shards(self) -> None:
+        sharded: cache.ShardedLRUCache[int, str] = cache.ShardedLRUCache(
+            200, shards=4
+        )
+        self.assertEqual(
+            [shard.info().maxsize for shard in sharded._shards], [67, 67, 66]
+        )
+        for key in range(300):
+            sharded.get_or_create(key, str)
+        self.assertEqual(sharded.get_or_create(299, repr), "299")
+        self.assertIn(299, sharded)
+        self.assertEqual(
+            sharded.info(), cache.CacheInfo(1, 300, 100, 200, 200)
+        )
+        self.assertEqual(len(sharded), 200)
+
+    def test_small_cache_is_exact(self) -> None:
+        sharded: cache.ShardedLRUCache[str, str] = cache.ShardedLRUCache(2)
+        self.assertEqual(len(sharded._shards), 1)
+        sharded.get_or_create("a", str.upper)
+        sharded.get_or_create("b", str.upper)
+        sharded.get_or_create("a", str.upper)
+        sharded.get_or_create("c", str.upper)
+        self.assertIn("a", sharded)
+        self.assertNotIn("b", sharded)
+
+    def test_resize(self) -> None:
+        sharded: cache.ShardedLRUCache[int, str] = cache.ShardedLRUCache(1024)
+        self.assertEqual(len(sharded._shards), 16)
+        for key in range(100):
+            sharded.get_or_create(key, str)
+        sharded.get_or_create(1, str)
+        sharded.resize(2048)
+        self.assertEqual(len(sharded._shards), 16)
+        self.assertEqual(len(sharded), 100)
+        sharded.resize(100)
+        self.assertEqual(len(sharded._shards), 1)
+        self.assertEqual(sharded.info(), cache.CacheInfo(1, 100, 0, 100, 100))
+        self.assertTrue(all(key in sharded for key in range(100)))
+        sharded.resize(10)
+        self.assertEqual(sharded.info().currsize, 10)
+        self.assertEqual(sharded.info().evictions, 90)
+        sharded.clear()
+        self.assertEqual(sharded.info(), cache.CacheInfo(0, 0, 0, 10, 0))
+
+    def test_rejects_bad_sizes(self) -> None:
+        self.assertRaises(ValueError, cache.ShardedLRUCache, -1)
+        self.assertRaises(ValueError, cache.ShardedLRUCache, 1, 0)
+        sharded: cache.ShardedLRUCache[int, str] = cache.ShardedLRUCache()
+        self.assertRaises(ValueError, sharded.resize, -1)
+
 
 class TestNativeTypeSupport(unittest.TestCase):
     context: variable.VariableValueMapping = {
@@ -26,8 +26,31 @@ __version_info__ = tuple(
 )
 
 from uritemplate.api import URITemplate
+from uritemplate.api import cache_clear
+from uritemplate.api import cache_info
+from uritemplate.api import dumps
 from uritemplate.api import expand
+from uritemplate.api import loads
 from uritemplate.api import partial
+from uritemplate.api import quote_cache_clear
+from uritemplate.api import quote_cache_info
+from uritemplate.api import set_cache_size
+from uritemplate.api import set_quote_cache_size
 from uritemplate.api import variables
-
-__all__ = ("URITemplate", "expand", "partial", "variables")
+from uritemplate.router import TemplateRouter
+
+__all__ = (
+    "TemplateRouter",
+    "URITemplate",
+    "cache_clear",
+    "cache_info",
+    "dumps",
+    "expand",
+    "loads",
+    "partial",
+    "quote_cache_clear",
+    "quote_cache_info",
+    "set_cache_size",
+    "set_quote_cache_size",
+    "variables",
+)
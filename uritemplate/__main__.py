@@ -0,0 +1,198 @@
+"""
+
+uritemplate.__main__
+====================
+
+This module is the command-line interface, ``python -m uritemplate``.
+
+What treasures await you:
+
+- main function
+
+You see a terminal in front of you.
+What do you do?
+>
+
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import typing as t
+
+from uritemplate import bulk
+from uritemplate import codegen
+from uritemplate.template import URITemplate
+
+#: Size of the buffers used to read and write files
+BUFFER_SIZE: t.Final[int] = 1 << 20
+
+_DESCRIPTION = """\
+Expand, inspect and match URI templates (RFC 6570) over streams.
+
+  expand TEMPLATE     read one JSON object of variables per line and write
+                      one expanded URI per line
+  variables TEMPLATE  write the names of the template's variables, one per
+                      line
+  match TEMPLATE      read one URI per line and write one JSON object of the
+                      variables matched from it per line, or null
+
+Empty input lines are skipped.
+"""
+
+
+class InputError(Exception):
+    """A line of input that cannot be used."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+
+
+def _lines(stream: t.BinaryIO) -> t.Iterator[t.Tuple[int, bytes]]:
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def _read_variables(stream: t.BinaryIO) -> t.Iterator[t.Dict[str, t.Any]]:
+    # json.loads() would guess the encoding of every line.
+    decode = json.JSONDecoder().decode
+    for number, line in _lines(stream):
+        try:
+            values = decode(line.decode("utf-8"))
+        except ValueError as error:
+            raise InputError(number, f"invalid JSON: {error}") from None
+        if not isinstance(values, dict):
+            raise InputError(number, "expected a JSON object")
+        yield values
+
+
+def _write(
+    output: t.BinaryIO, lines: t.Iterable[str], chunksize: int
+) -> None:
+    """Write the lines, joined in chunks to make few, large writes."""
+    lines = iter(lines)
+    while chunk := list(itertools.islice(lines, chunksize)):
+        chunk.append("")
+        output.write("\n".join(chunk).encode("utf-8"))
+
+
+def _expand(args: argparse.Namespace) -> t.Iterator[str]:
+    variables = _read_variables(args.input)
+    if args.processes == 1:
+        # Compiling takes longer than parsing, but pays off after a few
+        # hundred lines.
+        return map(codegen.compile_expand(args.template), variables)
+    return bulk.expand_parallel(
+        args.template,
+        variables,
+        processes=args.processes,
+        chunksize=args.chunksize,
+    )
+
+
+def _variables(args: argparse.Namespace) -> t.Iterator[str]:
+    return iter(URITemplate(args.template).variable_names)
+
+
+def _match(args: argparse.Namespace) -> t.Iterator[str]:
+    template = URITemplate(args.template)
+    for number, line in _lines(args.input):
+        try:
+            uri = line.decode("utf-8")
+        except UnicodeDecodeError as error:
+            raise InputError(number, f"invalid UTF-8: {error}") from None
+        yield json.dumps(template.match(uri), ensure_ascii=False)
+
+
+_COMMANDS: t.Final[
+    t.Dict[str, t.Callable[[argparse.Namespace], t.Iterator[str]]]
+] = {
+    "expand": _expand,
+    "variables": _variables,
+    "match": _match,
+}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m uritemplate",
+        description=_DESCRIPTION,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(_COMMANDS))
+    parser.add_argument("template", help="the URI template")
+    parser.add_argument(
+        "-i",
+        "--input",
+        default="-",
+        help="file to read, by default standard input",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="file to write, by default standard output",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=1,
+        help="number of processes expanding templates (default: 1)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=10_000,
+        help="lines read and written at a time (default: 10000)",
+    )
+    return parser
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Run the command line and return its exit status."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.processes < 1:
+        parser.error("--processes must be a positive integer")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be a positive integer")
+
+    with contextlib.ExitStack() as stack:
+        if args.command == "variables":
+            args.input = None
+        elif args.input == "-":
+            args.input = sys.stdin.buffer
+        else:
+            args.input = stack.enter_context(
+                open(args.input, "rb", buffering=BUFFER_SIZE)
+            )
+        if args.output == "-":
+            output = sys.stdout.buffer
+        else:
+            output = stack.enter_context(
+                open(args.output, "wb", buffering=BUFFER_SIZE)
+            )
+        try:
+            _write(output, _COMMANDS[args.command](args), args.chunksize)
+            output.flush()
+        except InputError as error:
+            name = getattr(args.input, "name", "<stdin>")
+            print(f"{parser.prog}: {name}: {error}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # The reader went away, e.g. ``| head``. Send what is left in
+            # the buffer nowhere, so that closing the output does not fail
+            # again.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), output.fileno())
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
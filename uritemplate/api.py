@@ -10,21 +10,95 @@ This module contains the very simple API provided by uritemplate.
 import typing as t
 
 from uritemplate import variable
+from uritemplate.cache import CacheInfo
+from uritemplate.cache import ShardedLRUCache
 from uritemplate.orderedset import OrderedSet
 from uritemplate.template import URITemplate
+from uritemplate.template import dumps
+from uritemplate.template import loads
+from uritemplate.variable import quote_cache_clear
+from uritemplate.variable import quote_cache_info
+from uritemplate.variable import set_quote_cache_size
+
+__all__ = (
+    "OrderedSet",
+    "URITemplate",
+    "cache_clear",
+    "cache_info",
+    "dumps",
+    "expand",
+    "loads",
+    "partial",
+    "quote_cache_clear",
+    "quote_cache_info",
+    "set_cache_size",
+    "set_quote_cache_size",
+    "variables",
+)
+
+#: Default number of parsed templates kept by :func:`expand`, :func:`partial`
+#: and :func:`variables`.
+DEFAULT_CACHE_SIZE: t.Final[int] = 512
+
+_template_cache: ShardedLRUCache[str, URITemplate] = ShardedLRUCache(
+    DEFAULT_CACHE_SIZE
+)
+
+
+def _template(uri: str) -> URITemplate:
+    return _template_cache.get_or_create(uri, URITemplate)
+
+
+def cache_info() -> CacheInfo:
+    """Report statistics about the cache of parsed templates.
+
+    The module-level :func:`expand`, :func:`partial` and :func:`variables`
+    functions keep the most recently used templates parsed so that calling
+    them repeatedly with the same template string does not re-parse it.
+
+    :returns: :class:`~uritemplate.cache.CacheInfo` with the ``hits``,
+        ``misses``, ``evictions``, ``maxsize`` and ``currsize`` of the cache
 
-__all__ = ("OrderedSet", "URITemplate", "expand", "partial", "variables")
+    Example::
+
+        expand('https://api.github.com{/end}', end='users')
+        expand('https://api.github.com{/end}', end='gists')
+        cache_info()
+        # => CacheInfo(hits=1, misses=1, evictions=0, maxsize=512,
+        #              currsize=1)
+
+    """
+    return _template_cache.info()
+
+
+def cache_clear() -> None:
+    """Empty the cache of parsed templates and reset its statistics."""
+    _template_cache.clear()
+
+
+def set_cache_size(maxsize: int) -> None:
+    """Change how many parsed templates are kept.
+
+    The least recently used templates are discarded if the cache currently
+    holds more than ``maxsize`` templates. A ``maxsize`` of ``0`` disables
+    the cache.
+
+    :param int maxsize: The maximum number of templates to keep
+    """
+    _template_cache.resize(maxsize)
 
 
 def expand(
     uri: str,
-    var_dict: t.Optional[variable.VariableValueMapping] = None,
+    var_dict: t.Optional[variable.VariableProvider] = None,
     **kwargs: variable.VariableValue,
 ) -> str:
     """Expand the template with the given parameters.
 
     :param str uri: The templated URI to expand
-    :param dict var_dict: Optional dictionary with variables and values
+    :param var_dict: Optional dictionary with variables and values, or
+        another provider of values, as accepted by
+        :meth:`URITemplate.expand`
     :param kwargs: Alternative way to pass arguments
     :returns: str
 
@@ -41,12 +115,12 @@ def expand(
               ``val2`` will be used instead of ``val1``.
 
     """
-    return URITemplate(uri).expand(var_dict, **kwargs)
+    return _template(uri).expand(var_dict, **kwargs)
 
 
 def partial(
     uri: str,
-    var_dict: t.Optional[variable.VariableValueMapping] = None,
+    var_dict: t.Optional[variable.VariableProvider] = None,
     **kwargs: variable.VariableValue,
 ) -> URITemplate:
     """Partially expand the template with the given parameters.
@@ -54,7 +128,9 @@ def partial(
     If all of the parameters for the template are not given, return a
     partially expanded template.
 
-    :param dict var_dict: Optional dictionary with variables and values
+    :param var_dict: Optional dictionary with variables and values, or
+        another provider of values, as accepted by
+        :meth:`URITemplate.expand`
     :param kwargs: Alternative way to pass arguments
     :returns: :class:`URITemplate`
 
@@ -64,7 +140,7 @@ def partial(
         t.partial()  # => URITemplate('https://api.github.com{/end}')
 
     """
-    return URITemplate(uri).partial(var_dict, **kwargs)
+    return _template(uri).partial(var_dict, **kwargs)
 
 
 def variables(uri: str) -> OrderedSet:
@@ -83,4 +159,4 @@ def variables(uri: str) -> OrderedSet:
         # => {'username', 'repository'}
 
     """
-    return OrderedSet(URITemplate(uri).variable_names)
+    return _template(uri).variable_names
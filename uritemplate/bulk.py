@@ -0,0 +1,161 @@
+"""
+
+uritemplate.bulk
+================
+
+This module expands one template for very many inputs in several processes.
+
+What treasures await you:
+
+- expand_parallel function
+
+You see a row of printing presses in front of you.
+What do you do?
+>
+
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import typing as t
+
+from uritemplate import template as _template
+from uritemplate import variable
+from uritemplate.template import URITemplate
+
+# The template of this worker process, set by _initialize().
+_worker_template: t.Optional[URITemplate] = None
+
+
+def _initialize(state: bytes) -> None:
+    global _worker_template
+    _worker_template = _template.loads(state)
+
+
+def _expand_chunk(
+    chunk: t.List[variable.VariableValueMapping],
+) -> t.List[str]:
+    assert _worker_template is not None
+    return _worker_template.expand_many(chunk)
+
+
+def _chunks(
+    inputs: t.Iterable[variable.VariableValueMapping], chunksize: int
+) -> t.Iterator[t.List[variable.VariableValueMapping]]:
+    iterator = iter(inputs)
+    while chunk := list(itertools.islice(iterator, chunksize)):
+        yield chunk
+
+
+def expand_parallel(
+    template: t.Union[URITemplate, str],
+    inputs: t.Iterable[variable.VariableValueMapping],
+    processes: t.Optional[int] = None,
+    chunksize: int = 1000,
+    ordered: bool = True,
+    shard: t.Optional[t.Tuple[int, int]] = None,
+) -> t.Iterator[str]:
+    """Expand ``template`` once for each input, in worker processes.
+
+    The parsed template is sent to each worker once, when it starts. The
+    inputs are read lazily and sent in chunks of ``chunksize`` mappings,
+    with at most two chunks per worker waiting at any time, so inputs and
+    results never have to fit in memory all at once. Each chunk is expanded
+    with :meth:`URITemplate.expand_many
+    <uritemplate.URITemplate.expand_many>`.
+
+    With ``ordered=False``, the expansions of a chunk are yielded as soon
+    as it is done, which keeps the workers busier when some chunks take
+    longer than others. Within a chunk they are always in order.
+
+    ``shard=(index, count)`` expands only the inputs at positions ``index``,
+    ``index + count``, ``index + 2 * count``, and so on. Several machines
+    reading the same inputs can each take one ``index`` to split a job
+    between them without overlap.
+
+    :param template: The template, or a template string
+    :param inputs: Iterable of mappings of variables to values. They are
+        pickled to be sent to the workers.
+    :param processes: Number of worker processes, by default one per CPU.
+        With ``1``, everything is expanded in this process.
+    :param chunksize: Number of inputs sent to a worker at a time
+    :param ordered: Whether to yield the expansions in the order of the
+        inputs
+    :param shard: Optional ``(index, count)`` of the share of the inputs to
+        expand
+    :returns: iterator of str
+    :raises ValueError: if ``processes``, ``chunksize``, or ``shard`` are
+        out of range
+
+    Example::
+
+        from uritemplate.bulk import expand_parallel
+
+        pages = expand_parallel(
+            'https://example.com/products{/id}',
+            ({'id': id} for id in range(100_000_000)),
+            processes=8,
+            chunksize=10_000,
+            shard=(host_index, host_count),
+        )
+        for uri in pages:
+            sitemap.write(uri + '\\n')
+
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be a positive integer")
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    if shard is not None:
+        index, count = shard
+        if not 0 <= index < count:
+            raise ValueError(
+                "shard must be (index, count) with 0 <= index < count"
+            )
+        inputs = itertools.islice(inputs, index, None, count)
+    if isinstance(template, str):
+        template = URITemplate(template)
+    return _expand(template, inputs, processes, chunksize, ordered)
+
+
+def _expand(
+    template: URITemplate,
+    inputs: t.Iterable[variable.VariableValueMapping],
+    processes: int,
+    chunksize: int,
+    ordered: bool,
+) -> t.Iterator[str]:
+    chunks = _chunks(inputs, chunksize)
+    if processes == 1:
+        for chunk in chunks:
+            yield from template.expand_many(chunk)
+        return
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+        processes,
+        initializer=_initialize,
+        initargs=(_template.dumps(template),),
+    )
+    pending: t.Deque["concurrent.futures.Future[t.List[str]]"]
+    pending = collections.deque()
+    try:
+        for chunk in itertools.islice(chunks, 2 * processes):
+            pending.append(executor.submit(_expand_chunk, chunk))
+        while pending:
+            if ordered:
+                done = pending.popleft()
+            else:
+                done = next(concurrent.futures.as_completed(pending))
+                pending.remove(done)
+            results = done.result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_expand_chunk, chunk))
+            yield from results
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
@@ -0,0 +1,210 @@
+"""
+
+uritemplate.cache
+=================
+
+This module contains the small, thread-safe LRU caches used to avoid parsing
+the same template string, or encoding the same value, over and over again.
+
+"""
+
+import collections
+import threading
+import typing as t
+
+K = t.TypeVar("K")
+V = t.TypeVar("V")
+
+
+class CacheInfo(t.NamedTuple):
+    """Statistics about a :class:`LRUCache`."""
+
+    #: Number of lookups that found an entry
+    hits: int
+    #: Number of lookups that had to create an entry
+    misses: int
+    #: Number of entries discarded to stay within ``maxsize``
+    evictions: int
+    #: Maximum number of entries kept
+    maxsize: int
+    #: Number of entries currently kept
+    currsize: int
+
+
+class LRUCache(t.Generic[K, V]):
+    """A size-bounded mapping that discards the least recently used entry.
+
+    A ``maxsize`` of ``0`` disables caching entirely: every lookup is a
+    miss and nothing is stored.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer")
+        self._maxsize = maxsize
+        self._data: "collections.OrderedDict[K, V]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get_or_create(self, key: K, factory: t.Callable[[K], V]) -> V:
+        """Return the entry for ``key``, creating it with ``factory``.
+
+        The factory is called without holding the lock so that a slow
+        factory does not block other threads. If two threads race to create
+        the same entry, both results are valid and the last one is kept.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return value
+
+        value = factory(key)
+        if self._maxsize:
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._evict(self._maxsize)
+        return value
+
+    def _evict(self, maxsize: int) -> None:
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum number of entries, evicting if necessary."""
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict(maxsize)
+
+    def info(self) -> CacheInfo:
+        """Return the current statistics of the cache."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._maxsize,
+                len(self._data),
+            )
+
+
+# Shards of a ShardedLRUCache hold at least this many entries, so that small
+# caches keep exact LRU order.
+_MIN_SHARD_SIZE: t.Final[int] = 64
+
+
+class ShardedLRUCache(t.Generic[K, V]):
+    """An :class:`LRUCache` split into shards with a lock each.
+
+    Keys are spread over the shards by their hash, so threads looking up
+    different keys rarely wait for each other. This matters on free-threaded
+    builds of Python, where one lock shared by every lookup is the only
+    thing that stops them from running in parallel.
+
+    Each shard discards its own least recently used entry, so the order is
+    only approximately least recently used across the whole cache. Caches
+    too small to give every shard ``64`` entries use fewer shards, down to
+    one, which behaves exactly like :class:`LRUCache`.
+    """
+
+    def __init__(self, maxsize: int = 128, shards: int = 16):
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer")
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        self._max_shards = shards
+        self._maxsize = maxsize
+        self._resize_lock = threading.Lock()
+        self._shards: t.Tuple[LRUCache[K, V], ...] = self._make_shards(
+            maxsize
+        )
+
+    def _make_shards(self, maxsize: int) -> t.Tuple[LRUCache[K, V], ...]:
+        count = max(1, min(self._max_shards, maxsize // _MIN_SHARD_SIZE))
+        size, extra = divmod(maxsize, count)
+        return tuple(
+            LRUCache(size + (index < extra)) for index in range(count)
+        )
+
+    def _shard(self, key: object) -> LRUCache[K, V]:
+        shards = self._shards
+        return shards[hash(key) % len(shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._shard(key)
+
+    def get_or_create(self, key: K, factory: t.Callable[[K], V]) -> V:
+        """Return the entry for ``key``, creating it with ``factory``."""
+        return self._shard(key).get_or_create(key, factory)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics."""
+        for shard in self._shards:
+            shard.clear()
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum number of entries, evicting if necessary."""
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer")
+        with self._resize_lock:
+            old = self._shards
+            new = self._make_shards(maxsize)
+            if len(new) == len(old):
+                for shard, replacement in zip(old, new):
+                    shard.resize(replacement._maxsize)
+            else:
+                # The keys belong to other shards now. Entries added to the
+                # old shards while they are moved may be lost, which only
+                # costs creating them again.
+                info = self.info()
+                first = new[0]
+                first._hits, first._misses = info.hits, info.misses
+                first._evictions = info.evictions
+                for shard in old:
+                    with shard._lock:
+                        items = list(shard._data.items())
+                    for key, value in items:
+                        target = new[hash(key) % len(new)]
+                        with target._lock:
+                            target._data[key] = value
+                            target._evict(target._maxsize)
+                self._shards = new
+            self._maxsize = maxsize
+
+    def info(self) -> CacheInfo:
+        """Return the current statistics of all shards together."""
+        infos = [shard.info() for shard in self._shards]
+        return CacheInfo(
+            sum(info.hits for info in infos),
+            sum(info.misses for info in infos),
+            sum(info.evictions for info in infos),
+            self._maxsize,
+            sum(info.currsize for info in infos),
+        )
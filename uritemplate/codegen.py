@@ -0,0 +1,161 @@
+"""
+
+uritemplate.codegen
+===================
+
+This module turns a URITemplate into a Python function that expands only
+that template.
+
+What treasures await you:
+
+- compile_expand function
+
+You see a printing press in front of you.
+What do you do?
+>
+
+"""
+
+import typing as t
+
+from uritemplate import variable
+from uritemplate.template import URITemplate
+
+#: The type of the functions returned by :func:`compile_expand`
+ExpandFunction = t.Callable[..., str]
+
+# Operators whose variables expand to name=value.
+_NAMED: t.Final[t.FrozenSet[variable.Operator]] = frozenset(
+    (
+        variable.Operator.path_style_parameter,
+        variable.Operator.form_style_query,
+        variable.Operator.form_style_query_continuation,
+    )
+)
+
+
+def _generate(
+    template: URITemplate,
+) -> t.Tuple[str, t.Dict[str, t.Any]]:
+    """Write the source of the expand function and the names it uses."""
+    head, segments = template._plan()
+    namespace: t.Dict[str, t.Any] = {
+        "resolve": template._resolve,
+        "unreserved": variable._UNRESERVED_CHARACTERS,
+    }
+    lines = [
+        "def expand(var_dict=None, /, **kwargs):",
+        "    if kwargs or var_dict.__class__ is not dict:",
+        "        var_dict = resolve(var_dict, kwargs)",
+    ]
+    if not segments:
+        lines.append(f"    return {template.uri!r}")
+        return "\n".join(lines) + "\n", namespace
+    lines.append("    get = var_dict.get")
+
+    result = [repr(head)] if head else []
+    count = 0
+    for i, (var, tail) in enumerate(segments):
+        namespace[f"quote{i}"] = var._quote
+        namespace[f"expand{i}"] = var._expand_variable
+        named = var.operator in _NAMED
+        fragments = []
+        for spec in var.variables:
+            v, f = f"v{count}", f"f{count}"
+            namespace[f"spec{count}"] = spec
+            fragments.append(f)
+            count += 1
+            fragment = var._bound.get(spec)
+            if fragment is not None:
+                # Bound by URITemplate.partial()
+                lines.append(f"    {f} = {fragment!r}")
+                continue
+            lines.append(f"    {v} = get({spec.name!r})")
+            # Non-empty strings are by far the most common values and the
+            # only ones expanded here. Everything else, including values
+            # that may be replaced by a default, takes the generic path.
+            lines.append(f"    if {v}.__class__ is str and {v}:")
+            if spec.prefix:
+                lines.append(f"        {v} = {v}[:{spec.prefix}]")
+            # Values made of unreserved characters only are never encoded.
+            quoted = (
+                f"{v} if {v}.isalnum() and {v}.isascii()"
+                f" or not {v}.strip(unreserved) else quote{i}({v})"
+            )
+            if named:
+                quoted = f"{spec.name + '='!r} + ({quoted})"
+            lines.append(f"        {f} = {quoted}")
+            if spec.name not in var.defaults:
+                lines += [f"    elif {v} is None:", f"        {f} = None"]
+            lines += [
+                "    else:",
+                f"        {f} = expand{i}(spec{count - 1}, {v})",
+            ]
+
+        e = f"e{i}"
+        prefix = f"{var._prefix!r} + " if var._prefix else ""
+        if len(fragments) == 1:
+            f = fragments[0]
+            lines.append(f"    {e} = '' if {f} is None else {prefix}{f}")
+        else:
+            # Usually every variable is defined and the expression is just
+            # its fragments and separators.
+            defined = " and ".join(f"{f} is not None" for f in fragments)
+            joined = var._separator.join(f"{{{f}}}" for f in fragments)
+            found = ", ".join(fragments)
+            join = f"{prefix}{var._separator!r}.join({e})"
+            lines += [
+                f"    if {defined}:",
+                f"        {e} = f{var._prefix + joined!r}",
+                "    else:",
+                f"        {e} = [f for f in ({found}) if f is not None]",
+                f"        {e} = {join} if {e} else ''",
+            ]
+        result.append(f"f'{{{e}}}'")
+        if tail:
+            result.append(repr(tail))
+
+    # Adjacent string literals and f-strings are compiled into a single
+    # string formatting operation.
+    lines.append(f"    return ({' '.join(result)})")
+    return "\n".join(lines) + "\n", namespace
+
+
+def compile_expand(template: t.Union[URITemplate, str]) -> ExpandFunction:
+    """Generate a function that expands ``template`` and nothing else.
+
+    The template's literal text, operators and variable names are written
+    into the source of a new function, which is compiled once. The function
+    takes the same arguments as :meth:`URITemplate.expand
+    <uritemplate.URITemplate.expand>` and returns the same string, but for
+    string values it does not have to look at the template at all, which
+    makes it several times faster. Other values, such as lists and
+    mappings, are expanded the usual way.
+
+    Compiling is much slower than parsing, so this is only worth it for
+    templates that are expanded many times.
+
+    :param template: The template, or a template string
+    :returns: a function with the signature of ``URITemplate.expand``
+
+    Example::
+
+        from uritemplate.codegen import compile_expand
+
+        expand_repo = compile_expand(
+            'https://api.github.com/repos{/owner,repo}'
+        )
+        expand_repo(owner='octocat', repo='hello-world')
+        # => 'https://api.github.com/repos/octocat/hello-world'
+        expand_repo({'owner': 'octocat', 'repo': 'hello-world'})
+        # => 'https://api.github.com/repos/octocat/hello-world'
+
+    """
+    if isinstance(template, str):
+        template = URITemplate(template)
+    source, namespace = _generate(template)
+    code = compile(source, f"<uritemplate {template.uri!r}>", "exec")
+    exec(code, namespace)  # nosec: the source is generated above
+    expand = t.cast(ExpandFunction, namespace["expand"])
+    expand.__doc__ = f"Expand {template.uri!r}."
+    return expand
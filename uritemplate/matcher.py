@@ -0,0 +1,594 @@
+"""
+
+uritemplate.matcher
+===================
+
+This module contains the TemplateMatcher class which powers
+:meth:`URITemplate.match <uritemplate.template.URITemplate.match>`.
+
+What treasures await you:
+
+- TemplateMatcher class
+
+You see a magnifying glass in front of you.
+What do you do?
+>
+
+"""
+
+import bisect
+import re
+import typing as t
+import urllib.parse
+
+from uritemplate import variable
+
+Operator = variable.Operator
+MatchedValues = t.Dict[str, variable.VariableValue]
+
+# Characters that may appear unencoded in an expanded value. A "%" stands for
+# a percent-encoded triplet, see _repeated().
+_UNENCODED: t.Final[str] = variable._UNRESERVED_CHARACTERS + "%"
+_UNENCODED_RESERVED: t.Final[str] = _UNENCODED + variable._RESERVED_CHARACTERS
+# Operators whose variables are expanded as name=value pairs.
+_NAMED_OPERATORS: t.Final[t.FrozenSet[Operator]] = frozenset(
+    (
+        Operator.path_style_parameter,
+        Operator.form_style_query,
+        Operator.form_style_query_continuation,
+    )
+)
+
+
+def _char_class(chars: str) -> str:
+    escaped = "".join(
+        "\\" + c if c in "\\]^-[" else c for c in sorted(set(chars))
+    )
+    return f"[{escaped}]"
+
+
+def _repeated(chars: str) -> str:
+    """Return a pattern that matches one of ``chars``.
+
+    When "%" is one of them, it only matches a whole percent-encoded
+    triplet: expanding a value never leaves a "%" that does not start one.
+    """
+    if "%" not in chars:
+        return _char_class(chars)
+    return f"(?:{_char_class(chars.replace('%', ''))}|%[0-9A-Fa-f]{{2}})"
+
+
+def _unquote(value: str) -> str:
+    return urllib.parse.unquote(value)
+
+
+class _Literal(t.NamedTuple):
+    text: str
+
+
+class _OneOf(t.NamedTuple):
+    chars: str
+
+
+class _Repeat(t.NamedTuple):
+    """Any number of ``chars``, as many as possible unless ``lazy``."""
+
+    chars: str
+    lazy: bool = False
+
+
+class _Optional(t.NamedTuple):
+    items: t.Tuple["_Item", ...]
+
+
+class _Group(t.NamedTuple):
+    name: str
+    items: t.Tuple["_Item", ...]
+
+
+# The patterns of a template are built from these, and then turned into a
+# regular expression, or into a program for _Scanner.
+_Item = t.Union[_Literal, _OneOf, _Repeat, _Optional, _Group]
+
+
+def _regex(items: t.Iterable[_Item]) -> str:
+    parts = []
+    for item in items:
+        if isinstance(item, _Literal):
+            parts.append(re.escape(item.text))
+        elif isinstance(item, _OneOf):
+            parts.append(_char_class(item.chars))
+        elif isinstance(item, _Repeat):
+            repeat = "*?" if item.lazy else "*"
+            parts.append(_repeated(item.chars) + repeat)
+        elif isinstance(item, _Optional):
+            parts.append(f"(?:{_regex(item.items)})?")
+        else:
+            parts.append(f"(?P<{item.name}>{_regex(item.items)})")
+    return "".join(parts)
+
+
+# Instructions of a _Scanner program
+_LITERAL, _ONE_OF, _REPEAT, _OPTIONAL, _OPEN, _CLOSE, _END = range(7)
+
+Groups = t.Dict[str, t.Optional[str]]
+
+
+class _Scanner:
+    """Matches the same URIs as the regular expression of a pattern.
+
+    Backtracking through adjacent expressions that may match the same
+    characters, such as ``{.a}{.b}{.c}``, takes time exponential in the
+    number of expressions when a URI does not match. Since nothing that is
+    matched depends on how a position was reached, this never explores an
+    instruction at a position twice, and takes time linear in the length of
+    the URI and the size of the template. Alternatives are tried in the
+    order the regular expression would try them, so both give the same
+    groups.
+    """
+
+    def __init__(self, items: t.Sequence[_Item]):
+        self._names: t.List[str] = []
+        self._program: t.List[t.Tuple[t.Any, ...]] = []
+        self._emit(items)
+        self._program.append((_END,))
+
+    def _emit(self, items: t.Iterable[_Item]) -> None:
+        program = self._program
+        for item in items:
+            if isinstance(item, _Literal):
+                if item.text:
+                    program.append((_LITERAL, item.text))
+            elif isinstance(item, _OneOf):
+                program.append((_ONE_OF, frozenset(item.chars)))
+            elif isinstance(item, _Repeat):
+                runs = re.compile(_repeated(item.chars) + "+").finditer
+                program.append(
+                    (
+                        _REPEAT,
+                        frozenset(item.chars),
+                        runs,
+                        item.lazy,
+                        "%" in item.chars,
+                    )
+                )
+            elif isinstance(item, _Optional):
+                index = len(program)
+                program.append((_OPTIONAL, -1))
+                self._emit(item.items)
+                # Where to continue when skipping the optional items
+                program[index] = (_OPTIONAL, len(program))
+            else:
+                group = len(self._names)
+                self._names.append(item.name)
+                program.append((_OPEN, group))
+                self._emit(item.items)
+                program.append((_CLOSE, group))
+
+    def is_deterministic(self) -> bool:
+        """Return whether the next character always decides what to do.
+
+        That is the case when no repetition may be followed by one of its
+        own characters, and no optional items start with a character that
+        may also follow them. The regular expression then never has to
+        backtrack more than a character, and is the faster choice.
+        """
+        program = self._program
+        # The characters that may come first from each instruction on
+        first: t.List[t.FrozenSet[str]] = [frozenset()] * len(program)
+        for index in reversed(range(len(program) - 1)):
+            instruction = program[index]
+            kind = instruction[0]
+            if kind == _LITERAL:
+                first[index] = frozenset(instruction[1][0])
+            elif kind == _ONE_OF:
+                first[index] = instruction[1]
+            elif kind == _REPEAT:
+                if instruction[1] & first[index + 1]:
+                    return False
+                first[index] = instruction[1] | first[index + 1]
+            elif kind == _OPTIONAL:
+                skip = instruction[1]
+                if first[index + 1] & first[skip]:
+                    return False
+                first[index] = first[index + 1] | first[skip]
+            else:
+                first[index] = first[index + 1]
+        return True
+
+    def fullmatch(self, uri: str) -> t.Optional[Groups]:
+        """Return the matched groups by name, if the whole URI matches."""
+        program = self._program
+        length = len(uri)
+        visited: t.Set[t.Tuple[int, int]] = set()
+        # Each repetition starting anywhere in the same run of its
+        # characters can stop at the same places, so only the stops before
+        # the earliest start already explored are new:
+        # (index, end of the run) => earliest start explored
+        explored: t.Dict[t.Tuple[int, int], int] = {}
+        # Index => starts and ends of the runs of its characters in the URI
+        runs: t.Dict[int, t.Tuple[t.List[int], t.List[int]]] = {}
+        captures = (-1,) * (2 * len(self._names))
+        stack = [(0, 0, captures)]
+        while stack:
+            index, position, captures = stack.pop()
+            instruction = program[index]
+            kind = instruction[0]
+            if kind == _REPEAT:
+                if index not in runs:
+                    spans = [found.span() for found in instruction[2](uri)]
+                    runs[index] = (
+                        [start for start, _ in spans],
+                        [end for _, end in spans],
+                    )
+                starts, ends = runs[index]
+                run = bisect.bisect_right(starts, position) - 1
+                if run >= 0 and position < ends[run]:
+                    run_end = ends[run]
+                else:
+                    run_end = position
+                explored_from = explored.get((index, run_end), run_end + 1)
+                if position >= explored_from:
+                    continue
+                explored[(index, run_end)] = position
+                stops: t.Sequence[int] = range(position, explored_from)
+                if instruction[4]:
+                    # Not in the middle of a percent-encoded triplet
+                    stops = [
+                        stop
+                        for stop in stops
+                        if uri.find("%", max(position, stop - 2), stop) < 0
+                    ]
+                # The last one pushed is tried first.
+                if instruction[3]:
+                    stops = stops[::-1]
+                stack.extend((index + 1, stop, captures) for stop in stops)
+                continue
+            if (index, position) in visited:
+                continue
+            visited.add((index, position))
+            if kind == _LITERAL:
+                if uri.startswith(instruction[1], position):
+                    stack.append(
+                        (index + 1, position + len(instruction[1]), captures)
+                    )
+            elif kind == _ONE_OF:
+                if position < length and uri[position] in instruction[1]:
+                    stack.append((index + 1, position + 1, captures))
+            elif kind == _OPTIONAL:
+                stack.append((instruction[1], position, captures))
+                stack.append((index + 1, position, captures))
+            elif kind == _END:
+                if position == length:
+                    return self._groups(uri, captures)
+            else:
+                slot = 2 * instruction[1] + (kind == _CLOSE)
+                updated = list(captures)
+                updated[slot] = position
+                stack.append((index + 1, position, tuple(updated)))
+        return None
+
+    def _groups(self, uri: str, captures: t.Tuple[int, ...]) -> Groups:
+        groups: Groups = {}
+        for group, name in enumerate(self._names):
+            start, end = captures[2 * group], captures[2 * group + 1]
+            groups[name] = uri[start:end] if end >= 0 else None
+        return groups
+
+
+class _Slot(t.NamedTuple):
+    """A variable of a positional expression and the group that matches it."""
+
+    group: str
+    name: str
+    explode: bool
+    prefix: t.Optional[int]
+    separator: str
+    #: Whether an empty match means the variable was not given at all,
+    #: unless the group of the next variable of the expression matched
+    empty_is_undefined: bool
+    #: The group of the next variable of the same expression
+    next_group: t.Optional[str]
+    #: Whether an unencoded "," can only come from joining a list
+    splits_lists: bool
+
+
+class _Run(t.NamedTuple):
+    """Adjacent name=value expressions that are matched as one region."""
+
+    group: str
+    #: Splits the matched region into its parameters
+    splitter: "re.Pattern[str]"
+    variables: t.Dict[str, t.Tuple[bool, t.Optional[int]]]
+
+
+class TemplateMatcher:
+    """This turns a URITemplate into a regular expression and runs it.
+
+    Positional expressions (``{var}``, ``{+var}``, ``{#var}``, ``{.var}``,
+    and ``{/var}``) are matched variable by variable, in order. Runs of
+    adjacent name=value expressions (``{;var}``, ``{?var}``, and
+    ``{&var}``) are matched as one region whose parameters are then
+    assigned by name, so query parameters may appear in any order. In
+    positional expressions of a partially expanded template, the fragments
+    of the bound variables are matched as literal text.
+
+    Matched values are percent-decoded. Exploded variables produce a list
+    of values, or a dictionary if every item is a ``key=value`` pair. A
+    non-exploded value with unencoded commas, such as ``red,green,blue``,
+    produces a list. Values of ``{+var}`` and ``{#var}`` are always returned
+    as a single string, since those expansions do not encode commas, and
+    decoding them is not guaranteed to give back the exact value that was
+    expanded.
+
+    When adjacent expressions may match the same characters, the regular
+    expression could take exponential time to reject a URI, so the
+    template is matched by a scanner that cannot.
+
+    """
+
+    def __init__(
+        self,
+        head: str,
+        segments: t.Sequence[t.Tuple[variable.URIVariable, str]],
+    ):
+        self._slots: t.List[_Slot] = []
+        self._runs: t.List[_Run] = []
+        items: t.List[_Item] = [_Literal(head)]
+        run: t.Optional[t.List[variable.URIVariable]] = None
+        for var, tail in segments:
+            if var.operator in _NAMED_OPERATORS:
+                if run and not self._continues(run[-1], var):
+                    items.append(self._run_pattern(run))
+                    run = None
+                run = (run or []) + [var]
+                if not tail:
+                    continue
+                items.append(self._run_pattern(run))
+                run = None
+            else:
+                if run:
+                    items.append(self._run_pattern(run))
+                    run = None
+                items.extend(self._positional_pattern(var))
+            items.append(_Literal(tail))
+        if run:
+            items.append(self._run_pattern(run))
+        #: The compiled regular expression for the whole template
+        self.regex: "re.Pattern[str]" = re.compile(_regex(items))
+        scanner = _Scanner(items)
+        self._fullmatch: t.Callable[[str], t.Optional[Groups]]
+        if scanner.is_deterministic():
+            self._fullmatch = self._regex_fullmatch
+        else:
+            self._fullmatch = scanner.fullmatch
+
+    def _regex_fullmatch(self, uri: str) -> t.Optional[Groups]:
+        match = self.regex.fullmatch(uri)
+        return None if match is None else match.groupdict()
+
+    @staticmethod
+    def _continues(
+        previous: variable.URIVariable, var: variable.URIVariable
+    ) -> bool:
+        separator = previous.operator.expansion_separator()
+        return separator == var.operator.expansion_separator()
+
+    def _next_group(self) -> str:
+        return f"_{len(self._slots) + len(self._runs)}"
+
+    def _positional_pattern(
+        self, var: variable.URIVariable
+    ) -> t.Tuple[_Item, ...]:
+        operator = var.operator
+        separator = operator.expansion_separator()
+        prefix = operator.variable_prefix()
+        reserved = operator in (Operator.reserved, Operator.fragment)
+        # Values of these may contain nearly anything, so match as little
+        # as possible and let the rest of the template decide.
+        allowed = _UNENCODED_RESERVED if reserved else _UNENCODED
+        last = len(var.variables) - 1
+
+        # Variables bound by URITemplate.partial() always expand to their
+        # fragment, which is matched as literal text.
+        bound = var._bound
+        groups: t.List[t.Union[_Group, _Literal]] = []
+        for index, spec in enumerate(var.variables):
+            name, explode, var_prefix = spec
+            fragment = bound.get(spec)
+            if fragment is not None:
+                groups.append(_Literal(fragment))
+                continue
+            chars = allowed + ("=," if explode else ",")
+            # Exploded items are joined with the separator, and the last
+            # variable may contain it when that is "," (a list) or "." (a
+            # dotted value). The others end at the first one.
+            if explode or (index == last and separator in ",."):
+                chars += separator
+            else:
+                chars = chars.replace(separator, "")
+            group = self._next_group()
+            self._slots.append(
+                _Slot(
+                    group,
+                    name,
+                    explode,
+                    var_prefix,
+                    separator,
+                    index == 0 and not prefix and not bound,
+                    None,
+                    not reserved,
+                )
+            )
+            if index and not bound:
+                previous = self._slots[-2]
+                self._slots[-2] = previous._replace(next_group=group)
+            groups.append(_Group(group, (_Repeat(chars, reserved),)))
+        if bound:
+            return self._bound_pattern(prefix, separator, groups)
+
+        nested: t.Tuple[_Item, ...] = ()
+        for group_item in reversed(groups[1:]):
+            nested = (_Optional((_Literal(separator), group_item) + nested),)
+        items = (_Literal(prefix), groups[0]) + nested
+        # Without a prefix, an empty first group means the same as none.
+        return (_Optional(items),) if prefix else items
+
+    @staticmethod
+    def _bound_pattern(
+        prefix: str,
+        separator: str,
+        groups: t.Sequence[t.Union[_Group, _Literal]],
+    ) -> t.Tuple[_Item, ...]:
+        """Match an expression where some variables are bound.
+
+        The fragments of the bound variables are always there, so the
+        expression is never empty. The variables between them are each
+        optional, and filled in from the left like those of any other
+        expression.
+        """
+        items: t.List[_Item] = [_Literal(prefix)]
+        pending: t.List[_Group] = []
+        after_fragment = False
+        for item in (*groups, None):
+            if isinstance(item, _Group):
+                pending.append(item)
+                continue
+            nested: t.Tuple[_Item, ...] = ()
+            for group in reversed(pending):
+                pair: t.Tuple[_Item, ...]
+                if after_fragment:
+                    pair = (_Literal(separator), group)
+                else:
+                    pair = (group, _Literal(separator))
+                nested = (_Optional(pair + nested),)
+            items.extend(nested)
+            pending = []
+            if item is not None:
+                text = item.text
+                items.append(
+                    _Literal(separator + text if after_fragment else text)
+                )
+                after_fragment = True
+        return tuple(items)
+
+    def _run_pattern(self, run: t.Sequence[variable.URIVariable]) -> _Item:
+        separator = run[0].operator.expansion_separator()
+        leaders = "".join({var.operator.variable_prefix() for var in run})
+        # The first parameter starts with one of the operator prefixes and
+        # every following one with the separator, or a prefix of a later
+        # expression when the earlier ones are undefined.
+        starts = leaders + separator
+        group = self._next_group()
+        self._runs.append(
+            _Run(
+                group,
+                re.compile(_char_class(starts)),
+                {
+                    name: (explode, prefix)
+                    for var in run
+                    for name, explode, prefix in var.variables
+                },
+            )
+        )
+        pairs = _Repeat(starts + _UNENCODED + "=,")
+        return _Group(group, (_Optional((_OneOf(leaders), pairs)),))
+
+    @staticmethod
+    def _unexploded(raw: str, splits_lists: bool) -> variable.VariableValue:
+        items = raw.split(",") if splits_lists else [raw]
+        if len(items) == 1:
+            return _unquote(raw)
+        return [_unquote(item) for item in items]
+
+    @staticmethod
+    def _exploded(raw: str, separator: str) -> variable.VariableValue:
+        items = raw.split(separator)
+        if all("=" in item for item in items):
+            pairs = (item.split("=", 1) for item in items)
+            return {_unquote(k): _unquote(v) for k, v in pairs}
+        return [_unquote(item) for item in items]
+
+    def match(self, uri: str) -> t.Optional[MatchedValues]:
+        """Match ``uri`` and return the decoded variables, if it matches."""
+        groups = self._fullmatch(uri)
+        if groups is None:
+            return None
+        values: MatchedValues = {}
+        # Values of prefixed variables, e.g. {var:3}, are only kept if the
+        # full value was not matched somewhere else.
+        truncated: t.Dict[str, variable.VariableValue] = {}
+
+        def store(
+            name: str, value: variable.VariableValue, full: bool
+        ) -> bool:
+            if not full:
+                truncated.setdefault(name, value)
+                return True
+            return values.setdefault(name, value) == value
+
+        for slot in self._slots:
+            raw = groups[slot.group]
+            if raw is None:
+                continue
+            if not raw and slot.empty_is_undefined:
+                if slot.next_group is None or groups[slot.next_group] is None:
+                    continue
+            if slot.explode:
+                value = self._exploded(raw, slot.separator)
+            else:
+                value = self._unexploded(raw, slot.splits_lists)
+            if not store(slot.name, value, slot.prefix is None):
+                return None
+
+        for run in self._runs:
+            parsed = self._parse_run(groups[run.group] or "", run)
+            if parsed is None:
+                return None
+            for name, (value, full) in parsed.items():
+                if not store(name, value, full):
+                    return None
+
+        for name, value in truncated.items():
+            values.setdefault(name, value)
+        return values
+
+    @staticmethod
+    def _parse_run(
+        raw: str, run: _Run
+    ) -> t.Optional[t.Dict[str, t.Tuple[variable.VariableValue, bool]]]:
+        exploded = [
+            name for name, (explode, _) in run.variables.items() if explode
+        ]
+        scalars: t.Dict[str, variable.VariableValue] = {}
+        lists: t.Dict[str, t.List[str]] = {}
+        extra: t.Dict[str, str] = {}
+        for pair in run.splitter.split(raw)[1:]:
+            key, _, raw = pair.partition("=")
+            # Variable names are expanded as written in the template, while
+            # the keys of an exploded dictionary are percent-encoded.
+            if key in run.variables:
+                explode, _ = run.variables[key]
+                if explode:
+                    lists.setdefault(key, []).append(_unquote(raw))
+                elif key in scalars:
+                    return None
+                else:
+                    scalars[key] = TemplateMatcher._unexploded(raw, True)
+            elif len(exploded) == 1:
+                key = _unquote(key)
+                if key in extra:
+                    return None
+                extra[key] = _unquote(raw)
+            else:
+                return None
+
+        parsed: t.Dict[str, t.Tuple[variable.VariableValue, bool]] = {
+            key: (value, run.variables[key][1] is None)
+            for key, value in scalars.items()
+        }
+        for key, items in lists.items():
+            parsed[key] = (items, True)
+        if extra:
+            parsed[exploded[0]] = (extra, True)
+        return parsed
@@ -1,80 +1,47 @@
-# From: https://github.com/ActiveState/code/blob/master/recipes/Python/576696_OrderedSet_with_Weakrefs/  # noqa
 import typing as t
-import weakref
-
-
-class Link:
-    """Representation of one item in a doubly-linked list."""
-
-    __slots__ = ("prev", "next", "key", "__weakref__")
-    prev: "Link"
-    next: "Link"
-    key: str
 
 
 class OrderedSet(t.MutableSet[str]):
     """A set that remembers the order in which items were added."""
 
-    # Big-O running times for all methods are the same as for regular sets.
-    # The internal self.__map dictionary maps keys to links in a doubly linked
-    # list. The circular doubly linked list starts and ends with a sentinel
-    # element. The sentinel element never gets deleted (this simplifies the
-    # algorithm). The prev/next links are weakref proxies (to prevent circular
-    # references). Individual links are kept alive by the hard reference in
-    # self.__map. Those hard references disappear when a key is deleted from
-    # an OrderedSet.
+    # Dictionaries remember insertion order, so the keys of a dictionary
+    # whose values are all None make an ordered set with the same Big-O
+    # running times as a regular set.
+
+    __slots__ = ("_items",)
 
     def __init__(self, iterable: t.Optional[t.Iterable[str]] = None):
-        self.__root = root = Link()  # sentinel node for doubly linked list
-        root.prev = root.next = root
-        self.__map: t.MutableMapping[str, Link] = {}  # key --> link
-        if iterable is not None:
-            self |= iterable  # type: ignore
+        self._items: t.Dict[str, None]
+        if isinstance(iterable, OrderedSet):
+            self._items = iterable._items.copy()
+        elif iterable is not None:
+            self._items = dict.fromkeys(iterable)
+        else:
+            self._items = {}
 
     def __len__(self) -> int:
-        return len(self.__map)
+        return len(self._items)
 
     def __contains__(self, key: object) -> bool:
-        return key in self.__map
+        return key in self._items
 
     def add(self, key: str) -> None:
-        # Store new key in a new link at the end of the linked list
-        if key not in self.__map:
-            self.__map[key] = link = Link()
-            root = self.__root
-            last = root.prev
-            link.prev, link.next, link.key = last, root, key
-            last.next = root.prev = weakref.proxy(link)
+        self._items[key] = None
 
     def discard(self, key: str) -> None:
-        # Remove an existing item using self.__map to find the link which is
-        # then removed by updating the links in the predecessor and successors.
-        if key in self.__map:
-            link = self.__map.pop(key)
-            link.prev.next = link.next
-            link.next.prev = link.prev
+        self._items.pop(key, None)
 
-    def __iter__(self) -> t.Generator[str, None, None]:
-        # Traverse the linked list in order.
-        root = self.__root
-        curr = root.next
-        while curr is not root:
-            yield curr.key
-            curr = curr.next
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._items)
 
-    def __reversed__(self) -> t.Generator[str, None, None]:
-        # Traverse the linked list in reverse order.
-        root = self.__root
-        curr = root.prev
-        while curr is not root:
-            yield curr.key
-            curr = curr.prev
+    def __reversed__(self) -> t.Iterator[str]:
+        return reversed(self._items)
 
     def pop(self, last: bool = True) -> str:
-        if not self:
+        if not self._items:
             raise KeyError("set is empty")
-        key = next(reversed(self)) if last else next(iter(self))
-        self.discard(key)
+        key = next(reversed(self._items) if last else iter(self._items))
+        del self._items[key]
         return key
 
     def __repr__(self) -> str:
@@ -87,6 +54,7 @@ class OrderedSet(t.MutableSet[str]):
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, OrderedSet):
-            return len(self) == len(other) and list(self) == list(other)
-        other = t.cast(t.Iterable[str], other)
-        return not self.isdisjoint(other)
+            return list(self._items) == list(other._items)
+        if isinstance(other, t.AbstractSet):
+            return self._items.keys() == other
+        return NotImplemented
@@ -0,0 +1,200 @@
+"""
+
+uritemplate.registry
+====================
+
+This module contains the TemplateRegistry class which loads many parsed
+templates from a single file.
+
+What treasures await you:
+
+- compile_registry function
+- TemplateRegistry class
+
+You see a card catalogue in front of you.
+What do you do?
+>
+
+"""
+
+import marshal
+import mmap
+import os
+import secrets
+import struct
+import threading
+import typing as t
+
+from uritemplate import template as _template
+from uritemplate.template import URITemplate
+
+_MAGIC: t.Final[bytes] = b"URITREG\x00"
+# Version of the file layout. The templates themselves are stored in the
+# form written by uritemplate.template.dumps(), which has its own version.
+_FORMAT_VERSION: t.Final[int] = 1
+# Magic, format version, and length of the index that follows the header.
+_HEADER: t.Final = struct.Struct("<8sII")
+
+PathType = t.Union[str, "os.PathLike[str]"]
+
+
+def compile_registry(
+    templates: t.Mapping[str, t.Union[URITemplate, str]], path: PathType
+) -> None:
+    """Parse a named set of templates and write them to one file.
+
+    The file can then be opened with :class:`TemplateRegistry`, which does
+    not have to parse the templates again. The file is written to a
+    temporary file first and then moved into place, so a registry that is
+    being read is never seen half written.
+
+    :param templates: Mapping of names to templates or template strings
+    :param path: Where to write the registry
+
+    Example::
+
+        compile_registry(
+            {
+                'user_repos': (
+                    'https://api.example.com/users{/user}/repos'
+                    '{?page,per_page}'
+                ),
+            },
+            'templates.reg',
+        )
+
+    """
+    index: t.Dict[str, t.Tuple[int, int]] = {}
+    blobs = []
+    offset = 0
+    for name, template in templates.items():
+        if isinstance(template, str):
+            template = URITemplate(template)
+        blob = _template.dumps(template)
+        index[name] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    packed_index = marshal.dumps(index)
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(packed_index))
+
+    fd, temporary = _create_temporary(path)
+    try:
+        with os.fdopen(fd, "wb") as registry_file:
+            registry_file.write(header)
+            registry_file.write(packed_index)
+            registry_file.writelines(blobs)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _create_temporary(path: PathType) -> t.Tuple[int, str]:
+    """Create a new file next to ``path``, to be moved there when written.
+
+    Unlike :func:`tempfile.mkstemp`, which makes the file readable by its
+    owner only, the file gets the permissions of any other new file, as
+    allowed by the umask, and keeps them when it is moved into place.
+    """
+    path = os.path.abspath(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        temporary = f"{path}.{secrets.token_hex(8)}.tmp"
+        try:
+            return os.open(temporary, flags, 0o666), temporary
+        except FileExistsError:
+            continue
+
+
+class TemplateRegistry(t.Mapping[str, URITemplate]):
+    """A read-only mapping of names to templates stored in one file.
+
+    The file is written by :func:`compile_registry` and memory-mapped when
+    the registry is opened. Only the index of names is read up front, and
+    each template is loaded, without being parsed, the first time it is
+    looked up. Loaded templates are kept, so looking a template up again
+    returns the same object.
+
+    The registry can be used as a context manager, which closes the file
+    at the end. Templates that were already loaded keep working after the
+    registry is closed.
+
+    Example::
+
+        from uritemplate.registry import TemplateRegistry
+
+        registry = TemplateRegistry('templates.reg')
+        registry['user_repos'].expand(user='octocat', page=2)
+        # => 'https://api.example.com/users/octocat/repos?page=2'
+
+    :param path: The file written by :func:`compile_registry`
+    :raises ValueError: if the file is not a registry written by a
+        compatible version of uritemplate
+    """
+
+    def __init__(self, path: PathType):
+        with open(path, "rb") as registry_file:
+            self._mmap = mmap.mmap(
+                registry_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        try:
+            self._index = self._read_index()
+        except BaseException:
+            self._mmap.close()
+            raise
+        self._templates: t.Dict[str, URITemplate] = {}
+        self._lock = threading.Lock()
+
+    def _read_index(self) -> t.Dict[str, t.Tuple[int, int]]:
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("not a template registry: file too short")
+        magic, version, index_size = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError("not a template registry")
+        if version != _FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported template registry version: {version!r}"
+            )
+        start = _HEADER.size
+        end = self._data_offset = start + index_size
+        try:
+            index = marshal.loads(self._mmap[start:end])
+        except (EOFError, TypeError, ValueError) as error:
+            raise ValueError(f"corrupt template registry: {error}") from None
+        return t.cast(t.Dict[str, t.Tuple[int, int]], index)
+
+    def __getitem__(self, name: str) -> URITemplate:
+        try:
+            return self._templates[name]
+        except KeyError:
+            pass
+        offset, length = self._index[name]
+        start = self._data_offset + offset
+        end = start + length
+        template = _template.loads(self._mmap[start:end])
+        with self._lock:
+            # Another thread may have loaded it in the meantime, keep the
+            # first one so that every lookup returns the same object.
+            return self._templates.setdefault(name, template)
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} of {len(self)} templates>"
+
+    def close(self) -> None:
+        """Close the file. Templates that are not loaded yet are lost."""
+        self._mmap.close()
+
+    def __enter__(self) -> "TemplateRegistry":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
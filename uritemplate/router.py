@@ -0,0 +1,262 @@
+"""
+
+uritemplate.router
+==================
+
+This module contains the TemplateRouter class which finds the template a URI
+was expanded from.
+
+What treasures await you:
+
+- TemplateRouter class
+
+You see a signpost in front of you.
+What do you do?
+>
+
+"""
+
+import bisect
+import re
+import typing as t
+
+from uritemplate import matcher
+from uritemplate import variable
+from uritemplate.template import URITemplate
+
+
+class RouteMatch(t.NamedTuple):
+    """The result of :meth:`TemplateRouter.match`."""
+
+    #: The template that matched
+    template: URITemplate
+    #: The variables extracted from the URI
+    variables: t.Dict[str, variable.VariableValue]
+
+
+class _Route(t.NamedTuple):
+    # Sorting key: the most specific template comes first
+    key: t.Tuple[int, int, int, int]
+    template: URITemplate
+
+
+class _Node:
+    """A node of the tree of the literal text and expressions of templates."""
+
+    __slots__ = ("label", "children", "expressions", "routes")
+
+    def __init__(self, label: str = ""):
+        #: Literal text on the edge leading to this node
+        self.label = label
+        #: Child nodes keyed on the first character of their label
+        self.children: t.Dict[str, "_Node"] = {}
+        #: How expressions look and the child nodes after them, keyed on
+        #: their operator
+        self.expressions: t.Dict[
+            variable.Operator, t.Tuple["_Expansion", "_Node"]
+        ] = {}
+        #: Templates that end at this node
+        self.routes: t.List[_Route] = []
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+class _Expansion(t.NamedTuple):
+    """What the expansion of an expression with an operator looks like."""
+
+    #: Every expansion that is not empty starts with this
+    prefix: str
+    #: The characters an expansion may contain
+    chars: t.FrozenSet[str]
+    #: Matches the longest run of those characters at a position
+    run: t.Callable[[str, int], t.Any]
+
+
+def _expansion(operator: variable.Operator) -> _Expansion:
+    if operator in (variable.Operator.reserved, variable.Operator.fragment):
+        chars = matcher._UNENCODED_RESERVED
+    else:
+        chars = matcher._UNENCODED + ",="
+    prefix = operator.variable_prefix()
+    chars += prefix + operator.expansion_separator()
+    return _Expansion(
+        prefix,
+        frozenset(chars),
+        re.compile(matcher._char_class(chars) + "*").match,
+    )
+
+
+_EXPANSIONS: t.Final[t.Dict[variable.Operator, _Expansion]] = {
+    operator: _expansion(operator) for operator in variable.Operator
+}
+
+
+class TemplateRouter:
+    """Match URIs against many templates at once.
+
+    Templates are indexed in a tree of their literal text and expressions,
+    where the literal text is a radix tree and each expression is an edge
+    that takes any run of the characters its expansion may contain, such as
+    ``{owner}`` taking ``octocat`` but not ``octocat/hello``. Looking up a
+    URI walks the tree along the URI, so only templates whose literal text
+    the URI contains in the right places are ever tried, however many
+    templates are registered.
+
+    When several templates match, the most specific one wins: the one with
+    the longest literal prefix, then the one with the most literal text,
+    then the one with the fewest expressions, and finally the one that was
+    added first.
+
+    Example::
+
+        from uritemplate import TemplateRouter
+
+        router = TemplateRouter([
+            'https://api.github.com/users{/user}',
+            'https://api.github.com/users{/user}/repos{?page}',
+            'https://api.github.com/repos{/owner,repo}',
+        ])
+        template, variables = router.match(
+            'https://api.github.com/users/octocat/repos?page=2'
+        )
+        # template => URITemplate('https://api.github.com/users{/user}/...')
+        # variables => {'user': 'octocat', 'page': '2'}
+
+    """
+
+    def __init__(self, templates: t.Iterable[t.Union[URITemplate, str]] = ()):
+        self._root = _Node()
+        self._templates: t.Dict[URITemplate, None] = {}
+        for template in templates:
+            self.add(template)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def __iter__(self) -> t.Iterator[URITemplate]:
+        return iter(self._templates)
+
+    def __contains__(self, template: object) -> bool:
+        if isinstance(template, str):
+            template = URITemplate(template)
+        return template in self._templates
+
+    def add(self, template: t.Union[URITemplate, str]) -> URITemplate:
+        """Register a template with the router.
+
+        :param template: The template, or a template string
+        :returns: the registered :class:`~uritemplate.URITemplate`
+        """
+        if isinstance(template, str):
+            template = URITemplate(template)
+        if template in self._templates:
+            return template
+        self._templates[template] = None
+
+        head, segments = template._plan()
+        literal = len(head) + sum(len(tail) for _, tail in segments)
+        route = _Route(
+            (-len(head), -literal, len(segments), len(self)), template
+        )
+        node = self._insert(self._root, head)
+        for var, tail in segments:
+            if var.operator not in node.expressions:
+                node.expressions[var.operator] = (
+                    _EXPANSIONS[var.operator],
+                    _Node(),
+                )
+            node = self._insert(node.expressions[var.operator][1], tail)
+        bisect.insort(node.routes, route)
+        return template
+
+    @staticmethod
+    def _insert(node: _Node, text: str) -> _Node:
+        while text:
+            child = node.children.get(text[0])
+            if child is None:
+                child = node.children[text[0]] = _Node(text)
+                return child
+            common = _common_prefix_length(text, child.label)
+            if common < len(child.label):
+                # Split the edge so that the shared part gets its own node.
+                middle = _Node(child.label[:common])
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                node.children[text[0]] = middle
+                child = middle
+            node = child
+            text = text[common:]
+        return node
+
+    def _candidates(self, uri: str) -> t.List[_Route]:
+        found: t.List[_Route] = []
+        length = len(uri)
+        # An expression can end anywhere in its run of characters, so the
+        # same node may be reached at the same position in several ways.
+        # Literal text only leads to a node in one way.
+        reached: t.Set[t.Tuple[_Node, int]] = set()
+        pending = [(self._root, 0)]
+        while pending:
+            node, position = pending.pop()
+            if position == length:
+                found.extend(node.routes)
+            else:
+                child = node.children.get(uri[position])
+                if child is not None and uri.startswith(
+                    child.label, position
+                ):
+                    pending.append((child, position + len(child.label)))
+            for expansion, after in node.expressions.values():
+                end = position
+                if uri.startswith(expansion.prefix, position):
+                    end = expansion.run(uri, position).end()
+                stops: t.Iterable[int]
+                if after.expressions:
+                    stops = range(position, end + 1)
+                else:
+                    # Only literal text can follow, which usually starts
+                    # with a character the expansion cannot contain.
+                    stops = [end]
+                    for first in after.children:
+                        if first in expansion.chars:
+                            stop = uri.find(first, position, end)
+                            while stop >= 0:
+                                stops.append(stop)
+                                stop = uri.find(first, stop + 1, end)
+                for stop in stops:
+                    if (after, stop) not in reached:
+                        reached.add((after, stop))
+                        pending.append((after, stop))
+        found.sort()
+        return found
+
+    def _matches(self, uri: str) -> t.Iterator[RouteMatch]:
+        for route in self._candidates(uri):
+            variables = route.template.match(uri)
+            if variables is not None:
+                yield RouteMatch(route.template, variables)
+
+    def match(self, uri: str) -> t.Optional[RouteMatch]:
+        """Find the most specific template that matches ``uri``.
+
+        :param str uri: The URI to match
+        :returns: :class:`RouteMatch` of the template and the variables
+            extracted from the URI, or ``None`` if no template matches
+
+        """
+        return next(self._matches(uri), None)
+
+    def match_all(self, uri: str) -> t.List[RouteMatch]:
+        """Find every template that matches ``uri``.
+
+        :param str uri: The URI to match
+        :returns: list of :class:`RouteMatch`, most specific first
+
+        """
+        return list(self._matches(uri))
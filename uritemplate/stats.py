@@ -0,0 +1,375 @@
+"""
+
+uritemplate.stats
+=================
+
+This module counts and times what templates do while it is enabled.
+
+What treasures await you:
+
+- enable function
+- disable function
+- is_enabled function
+- reset function
+- snapshot function
+
+You see a tally sheet in front of you.
+What do you do?
+>
+
+"""
+
+import functools
+import threading
+import time
+import typing as t
+import weakref
+
+from uritemplate import api
+from uritemplate import codegen
+from uritemplate import variable
+from uritemplate.template import URITemplate
+
+# Durations are counted in buckets by the power of two microseconds they
+# stay below. The last bucket takes everything longer.
+_BUCKETS: t.Final[int] = 24
+_BUCKET_LABELS: t.Final[t.Tuple[str, ...]] = tuple(
+    str(2**i) for i in range(_BUCKETS)
+) + ("+Inf",)
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (_BUCKETS + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        index = int(seconds * 1e6).bit_length()
+        self.buckets[min(index, _BUCKETS)] += 1
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "buckets_us": dict(zip(_BUCKET_LABELS, self.buckets)),
+        }
+
+
+#: The number of template strings counted separately. Once that many are
+#: counted, the others are counted together under :data:`OTHER_TEMPLATES`.
+MAX_TEMPLATES: t.Final[int] = 1000
+#: The key of the templates counted together in :func:`snapshot`
+OTHER_TEMPLATES: t.Final[str] = "<other>"
+
+# What is counted for each template.
+_OPERATIONS: t.Final[t.Tuple[str, ...]] = (
+    "parse",
+    "expand",
+    "expand_bytes",
+    "expand_parts",
+    "expand_many",
+    "expand_columns",
+    "compiled",
+    "partial",
+)
+
+_lock = threading.Lock()
+# Template string => operation => count
+_counts: t.Dict[str, t.Dict[str, int]] = {}
+# Operation => latency histogram
+_latency: t.Dict[str, _Histogram] = {}
+# The methods of URITemplate, and the functions, that are replaced while
+# enabled, by name.
+_originals: t.Dict[str, t.Callable[..., t.Any]] = {}
+# id() of a template made by partial() => the template string it is
+# counted under, that of the template it came from. Otherwise every
+# partial expansion could add a template string to count.
+_origins: t.Dict[int, str] = {}
+# Set while a counted call runs in this thread, so that the methods it
+# calls, like iter_expand() for expand_many(), are not counted again.
+_local = threading.local()
+
+
+def _key(template: URITemplate) -> str:
+    return _origins.get(id(template), template.uri)
+
+
+def _record(uri: str, operation: str, seconds: t.Optional[float]) -> None:
+    with _lock:
+        counts = _counts.get(uri)
+        if counts is None:
+            if len(_counts) >= MAX_TEMPLATES:
+                uri = OTHER_TEMPLATES
+            counts = _counts.get(uri)
+            if counts is None:
+                counts = _counts[uri] = dict.fromkeys(_OPERATIONS, 0)
+        counts[operation] += 1
+        if seconds is not None:
+            histogram = _latency.get(operation)
+            if histogram is None:
+                histogram = _latency[operation] = _Histogram()
+            histogram.add(seconds)
+
+
+def _counted_compile(
+    method: t.Callable[..., t.Any],
+) -> t.Callable[..., t.Any]:
+    @functools.wraps(method)
+    def _compile(self: URITemplate) -> t.Any:
+        segments = method(self)
+        _record(_key(self), "parse", None)
+        return segments
+
+    return _compile
+
+
+def _timed(
+    operation: str, method: t.Callable[..., t.Any]
+) -> t.Callable[..., t.Any]:
+    timer = time.perf_counter
+
+    @functools.wraps(method)
+    def wrapper(self: URITemplate, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        if getattr(_local, "busy", False):
+            return method(self, *args, **kwargs)
+        _local.busy = True
+        start = timer()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            seconds = timer() - start
+            _local.busy = False
+            _record(_key(self), operation, seconds)
+
+    return wrapper
+
+
+def _timed_iterator(
+    operation: str, method: t.Callable[..., t.Iterator[str]]
+) -> t.Callable[..., t.Iterator[str]]:
+    @functools.wraps(method)
+    def wrapper(
+        self: URITemplate, *args: t.Any, **kwargs: t.Any
+    ) -> t.Iterator[str]:
+        iterator = method(self, *args, **kwargs)
+        if getattr(_local, "busy", False):
+            return iterator
+        return _timed_steps(_key(self), operation, iterator)
+
+    return wrapper
+
+
+def _timed_steps(
+    uri: str, operation: str, iterator: t.Iterator[str]
+) -> t.Iterator[str]:
+    # Only the time spent in the iterator counts, not that of its reader.
+    timer = time.perf_counter
+    seconds = 0.0
+    try:
+        while True:
+            busy = getattr(_local, "busy", False)
+            _local.busy = True
+            start = timer()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds += timer() - start
+                _local.busy = busy
+            yield item
+    finally:
+        _record(uri, operation, seconds)
+
+
+def _counted_partial(
+    method: t.Callable[..., URITemplate],
+) -> t.Callable[..., URITemplate]:
+    timed = _timed("partial", method)
+
+    @functools.wraps(method)
+    def partial(self: URITemplate, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        template = timed(self, *args, **kwargs)
+        key = id(template)
+        _origins[key] = _key(self)
+        weakref.finalize(template, _origins.pop, key, None)
+        return template
+
+    return partial
+
+
+def _counted_compile_expand(
+    function: t.Callable[..., codegen.ExpandFunction],
+) -> t.Callable[..., codegen.ExpandFunction]:
+    timer = time.perf_counter
+
+    @functools.wraps(function)
+    def compile_expand(
+        template: t.Union[URITemplate, str],
+    ) -> codegen.ExpandFunction:
+        expand = function(template)
+        uri = template if isinstance(template, str) else _key(template)
+
+        @functools.wraps(expand)
+        def counted(*args: t.Any, **kwargs: t.Any) -> str:
+            if not _originals:
+                return expand(*args, **kwargs)
+            start = timer()
+            try:
+                return expand(*args, **kwargs)
+            finally:
+                _record(uri, "compiled", timer() - start)
+
+        return counted
+
+    return compile_expand
+
+
+def enable() -> None:
+    """Start counting and timing what templates do.
+
+    While enabled, every parse of a template is counted, and every call
+    that expands or partially expands a template is counted and timed:
+    :meth:`~uritemplate.URITemplate.expand`,
+    :meth:`~uritemplate.URITemplate.expand_bytes`,
+    :meth:`~uritemplate.URITemplate.expand_parts` and
+    :meth:`~uritemplate.URITemplate.expand_into`,
+    :meth:`~uritemplate.URITemplate.expand_many` and
+    :meth:`~uritemplate.URITemplate.iter_expand`,
+    :meth:`~uritemplate.URITemplate.expand_columns`,
+    :meth:`~uritemplate.URITemplate.partial`, and the functions made by
+    :func:`~uritemplate.codegen.compile_expand` while enabled. Calls made
+    by another counted call, such as :func:`uritemplate.expand` or
+    ``expand_many`` calling ``iter_expand``, count once. This adds a lock
+    and two clock reads to every call.
+
+    Templates made by ``partial`` are counted as the template they came
+    from, and at most :data:`MAX_TEMPLATES` template strings are counted
+    separately, so the counts take a bounded amount of memory.
+
+    When disabled, which is the default, the methods are the plain ones
+    and nothing is recorded, so there is no cost at all, except for a
+    check in the functions compiled while enabled.
+
+    Example::
+
+        from uritemplate import stats
+
+        stats.enable()
+        ...
+        stats.snapshot()['templates']
+        # => {'https://api.github.com/users{/user}':
+        #         {'parse': 1, 'expand': 1200, 'expand_bytes': 0, ...}}
+
+    """
+    with _lock:
+        if _originals:
+            return
+        _originals.update(
+            _compile=URITemplate._compile,
+            expand=URITemplate.expand,
+            expand_bytes=URITemplate.expand_bytes,
+            expand_parts=URITemplate.expand_parts,
+            expand_into=URITemplate.expand_into,
+            iter_expand=URITemplate.iter_expand,
+            expand_many=URITemplate.expand_many,
+            expand_columns=URITemplate.expand_columns,
+            partial=URITemplate.partial,
+            compile_expand=codegen.compile_expand,
+        )
+        wrappers = {
+            "_compile": _counted_compile(URITemplate._compile),
+            "expand": _timed("expand", URITemplate.expand),
+            "expand_bytes": _timed("expand_bytes", URITemplate.expand_bytes),
+            "expand_parts": _timed_iterator(
+                "expand_parts", URITemplate.expand_parts
+            ),
+            "expand_into": _timed("expand_parts", URITemplate.expand_into),
+            "iter_expand": _timed_iterator(
+                "expand_many", URITemplate.iter_expand
+            ),
+            "expand_many": _timed("expand_many", URITemplate.expand_many),
+            "expand_columns": _timed(
+                "expand_columns", URITemplate.expand_columns
+            ),
+            "partial": _counted_partial(URITemplate.partial),
+        }
+        for name, wrapper in wrappers.items():
+            setattr(URITemplate, name, wrapper)
+        codegen.compile_expand = _counted_compile_expand(
+            codegen.compile_expand
+        )
+
+
+def disable() -> None:
+    """Stop recording. What was recorded so far is kept."""
+    with _lock:
+        compile_expand = _originals.pop("compile_expand", None)
+        if compile_expand is not None:
+            codegen.compile_expand = compile_expand
+        for name, method in _originals.items():
+            setattr(URITemplate, name, method)
+        _originals.clear()
+
+
+def is_enabled() -> bool:
+    """Return whether templates are being counted and timed."""
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Forget everything recorded so far."""
+    with _lock:
+        _counts.clear()
+        _latency.clear()
+
+
+def snapshot() -> t.Dict[str, t.Any]:
+    """Return what was recorded so far as a dictionary of plain values.
+
+    The dictionary can be turned into JSON as it is, and has the keys:
+
+    ``enabled``
+        Whether recording is enabled.
+    ``templates``
+        The number of times each template string was parsed (``parse``),
+        and the number of calls that expanded it, by how: ``expand``,
+        ``expand_bytes``, ``expand_parts`` (or ``expand_into``),
+        ``expand_many`` (or ``iter_expand``), ``expand_columns``,
+        ``compiled`` for functions made by
+        :func:`~uritemplate.codegen.compile_expand`, and ``partial``.
+        Past :data:`MAX_TEMPLATES` template strings, the others are
+        counted together under :data:`OTHER_TEMPLATES`.
+    ``latency``
+        For each of these calls, the number of calls (``count``),
+        the time they took altogether (``total_seconds``), and how many of
+        them took less than each power of two microseconds
+        (``buckets_us``). The ``"+Inf"`` bucket counts the slower ones.
+    ``caches``
+        The ``hits``, ``misses``, ``evictions``, ``maxsize`` and
+        ``currsize`` of the cache of parsed templates (``templates``) and
+        of percent-encoded values (``quoted_values``). These are counted
+        whether or not recording is enabled.
+
+    :returns: dict
+    """
+    with _lock:
+        templates = {uri: dict(counts) for uri, counts in _counts.items()}
+        latency = {
+            operation: histogram.as_dict()
+            for operation, histogram in _latency.items()
+        }
+    return {
+        "enabled": is_enabled(),
+        "templates": templates,
+        "latency": latency,
+        "caches": {
+            "templates": api.cache_info()._asdict(),
+            "quoted_values": variable.quote_cache_info()._asdict(),
+        },
+    }
@@ -15,24 +15,77 @@ What do you do?
 
 """
 
+import collections.abc
+import marshal
 import re
 import typing as t
 
+from uritemplate import matcher
 from uritemplate import orderedset
 from uritemplate import variable
 
 template_re = re.compile("{([^}]+)}")
+# Octets of UTF-8 encoded text that are not ASCII.
+_non_ascii_re = re.compile(rb"[\x80-\xff]")
 
+# Version of the serialized form written by dumps(). Bump it whenever the
+# layout of URITemplate._state() or URIVariable._state() changes.
+_STATE_VERSION: t.Final[int] = 2
 
-def _merge(
-    var_dict: t.Optional[variable.VariableValueMapping],
-    overrides: variable.VariableValueMapping,
-) -> variable.VariableValueMapping:
-    if var_dict:
-        opts = dict(var_dict)
-        opts.update(overrides)
-        return opts
-    return overrides
+# Upper bound on the number of distinct inputs remembered by iter_expand.
+_BATCH_MEMO_SIZE: t.Final[int] = 4096
+
+
+def _as_list(values: t.Iterable[t.Any]) -> t.Sequence[t.Any]:
+    if isinstance(values, (str, bytes)):
+        raise TypeError(
+            f"expected a column of values, not a single value: {values!r}"
+        )
+    # NumPy arrays and pandas Series convert themselves to lists of native
+    # Python values much faster than iterating over them does.
+    tolist = getattr(values, "tolist", None)
+    if tolist is not None:
+        return t.cast(t.List[t.Any], tolist())
+    if isinstance(values, (list, tuple)):
+        return values
+    return list(values)
+
+
+def _ascii(uri: str) -> bytes:
+    if uri.isascii():
+        return uri.encode("ascii")
+    # Expanded values are always ASCII, but literal text may not be.
+    return _non_ascii_re.sub(
+        lambda octet: b"%%%02X" % octet[0][0], uri.encode("utf-8")
+    )
+
+
+class _SupportsWrite(t.Protocol):
+    def write(self, s: str, /) -> object: ...
+
+
+def _lookup(
+    provider: variable.VariableProvider,
+) -> t.Callable[[str], t.Any]:
+    """Return a function that looks a variable up in ``provider``.
+
+    The function returns ``None`` for variables the provider does not have.
+    """
+    if isinstance(provider, collections.abc.Mapping):
+        return provider.get
+    if hasattr(type(provider), "__getitem__"):
+        getitem = t.cast(t.Mapping[str, t.Any], provider).__getitem__
+
+        def lookup(name: str) -> t.Any:
+            try:
+                return getitem(name)
+            except LookupError:
+                return None
+
+        return lookup
+    if callable(provider):
+        return provider
+    return lambda name: getattr(provider, name, None)
 
 
 class URITemplate:
@@ -65,22 +118,126 @@ class URITemplate:
     Also, ``URITemplates`` are hashable so they can be used as keys in
     dictionaries.
 
+    A parsed template keeps the template string, the literal text between
+    its expressions, one :class:`~uritemplate.variable.URIVariable` per
+    expression (with a :class:`~uritemplate.variable.VarSpec` per variable)
+    and the set of variable names. Both classes use ``__slots__``. On
+    CPython 3.11, a template such as
+    ``https://api.github.com/repos{/owner,repo}/issues{?state,page}`` takes
+    about 1.7 kB on top of the template string itself.
+
+    Passing ``lazy=True`` only stores the template string. It is parsed the
+    first time the template is expanded, matched, or its ``variables`` or
+    ``variable_names`` are looked at. This makes creating templates that
+    are rarely used, such as the ``*_url`` fields of an API response,
+    nearly free::
+
+        urls = {
+            key: URITemplate(value, lazy=True)
+            for key, value in response.json().items()
+            if key.endswith('_url')
+        }
+
+    Templates can be shared between threads without locks, including on
+    free-threaded builds of Python. Nothing about a template changes after
+    it is parsed: its variables are a tuple, their defaults are read-only,
+    and ``variable_names`` returns a copy. A lazy template used by several
+    threads at once may be parsed by more than one of them, which is
+    harmless.
+
     """
 
-    def __init__(self, uri: str):
+    __slots__ = (
+        "uri",
+        "_variables",
+        "_variable_names",
+        "_head",
+        "_segments",
+        "_matcher",
+        "__weakref__",
+    )
+
+    def __init__(self, uri: str, lazy: bool = False):
         #: The original URI to be parsed.
         self.uri: str = uri
-        #: A list of the variables in the URI. They are stored as
-        #: :class:`~uritemplate.variable.URIVariable`\ s
-        self.variables: t.List[variable.URIVariable] = [
-            variable.URIVariable(m.groups()[0])
-            for m in template_re.finditer(self.uri)
-        ]
-        #: A set of variable names in the URI.
-        self.variable_names = orderedset.OrderedSet()
-        for var in self.variables:
-            for name in var.variable_names:
-                self.variable_names.add(name)
+        self._variables: t.Tuple[variable.URIVariable, ...]
+        # Never handed out, see variable_names.
+        self._variable_names: orderedset.OrderedSet
+        # The compiled form of the template: the literal text before the
+        # first expression followed by (expression, literal text after it)
+        # pairs. Expansion only fills in the expressions and joins. It is
+        # None until the template has been parsed.
+        self._head: str
+        self._segments: t.Optional[
+            t.Tuple[t.Tuple[variable.URIVariable, str], ...]
+        ] = None
+        # Built the first time match() is called.
+        self._matcher: t.Optional[matcher.TemplateMatcher] = None
+        if not lazy:
+            self._compile()
+
+    def _compile(self) -> t.Tuple[t.Tuple[variable.URIVariable, str], ...]:
+        # Literal text and expressions alternate, starting and ending with
+        # (possibly empty) literal text.
+        parts = template_re.split(self.uri)
+        variables = tuple(variable.URIVariable(e) for e in parts[1::2])
+        self._head = parts[0]
+        self._variables = variables
+        self._variable_names = orderedset.OrderedSet(
+            spec.name for var in variables for spec in var.variables
+        )
+        # Set last: a template counts as parsed once this is not None.
+        segments = self._segments = tuple(zip(variables, parts[2::2]))
+        return segments
+
+    def _plan(
+        self,
+    ) -> t.Tuple[str, t.Tuple[t.Tuple[variable.URIVariable, str], ...]]:
+        segments = self._segments
+        if segments is None:
+            segments = self._compile()
+        return self._head, segments
+
+    @property
+    def variables(self) -> t.Tuple[variable.URIVariable, ...]:
+        """A tuple of the variables in the URI.
+
+        They are stored as :class:`~uritemplate.variable.URIVariable`
+        objects.
+        """
+        if self._segments is None:
+            self._compile()
+        return self._variables
+
+    @property
+    def variable_names(self) -> orderedset.OrderedSet:
+        """A set of variable names in the URI.
+
+        This is a new set every time, changing it does not change the
+        template.
+        """
+        return orderedset.OrderedSet(self._names())
+
+    def _names(self) -> orderedset.OrderedSet:
+        if self._segments is None:
+            self._compile()
+        return self._variable_names
+
+    def _state(self) -> "_TemplateState":
+        """Return the parsed template as a tuple of builtin values."""
+        head, segments = self._plan()
+        return (
+            _STATE_VERSION,
+            self.uri,
+            head,
+            tuple((var._state(), tail) for var, tail in segments),
+        )
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        if self._segments is None:
+            # Not parsed yet, so there is nothing to save but the string.
+            return (URITemplate, (self.uri, True))
+        return (_from_state, (self._state(),))
 
     def __repr__(self) -> str:
         return 'URITemplate("%s")' % self
@@ -96,37 +253,53 @@ class URITemplate:
     def __hash__(self) -> int:
         return hash(self.uri)
 
-    def _expand(
-        self, var_dict: variable.VariableValueMapping, replace: bool
-    ) -> str:
-        if not self.variables:
+    def _resolve(
+        self,
+        provider: t.Optional[variable.VariableProvider],
+        overrides: variable.VariableValueMapping,
+    ) -> variable.VariableValueMapping:
+        """Collect the values of this template's variables.
+
+        Mappings without overrides are used as they are. Anything else is
+        asked for each of the template's variables once, and only those are
+        copied.
+        """
+        if provider is None:
+            return overrides
+        if isinstance(provider, collections.abc.Mapping):
+            if not overrides:
+                return provider
+            if not provider:
+                return overrides
+        lookup = _lookup(provider)
+        values = {}
+        for name in self._names():
+            value = overrides[name] if name in overrides else lookup(name)
+            if value is not None:
+                values[name] = value
+        return values
+
+    def _expand(self, var_dict: variable.VariableValueMapping) -> str:
+        segments = self._segments
+        if segments is None:
+            segments = self._compile()
+        if not segments:
             return self.uri
 
-        expansion = var_dict
-        expanded: t.Dict[str, str] = {}
-        for v in self.variables:
-            expanded.update(v.expand(expansion))
-
-        def replace_all(match: "re.Match[str]") -> str:
-            return expanded.get(match.groups()[0], "")
-
-        def replace_partial(match: "re.Match[str]") -> str:
-            match_group = match.groups()[0]
-            var = "{%s}" % match_group
-            return expanded.get(match_group) or var
-
-        replace_func = replace_partial if replace else replace_all
-
-        return template_re.sub(replace_func, self.uri)
+        head = self._head
+        return head + "".join(
+            [var._expand(var_dict) + tail for var, tail in segments]
+        )
 
     def expand(
         self,
-        var_dict: t.Optional[variable.VariableValueMapping] = None,
+        var_dict: t.Optional[variable.VariableProvider] = None,
         **kwargs: variable.VariableValue,
     ) -> str:
         """Expand the template with the given parameters.
 
-        :param dict var_dict: Optional dictionary with variables and values
+        :param var_dict: Optional dictionary with variables and values, or
+            another provider of values
         :param kwargs: Alternative way to pass arguments
         :returns: str
 
@@ -136,6 +309,20 @@ class URITemplate:
             t.expand({'end': 'users'})
             t.expand(end='gists')
 
+        Values do not have to be in a dictionary. Any other mapping works,
+        and so does a callable that takes a variable name, an object with
+        ``__getitem__``, or an object whose attributes are the variables::
+
+            t = URITemplate('https://api.github.com/users{/login}{?page}')
+            t.expand(user)  # uses user.login and user.page
+            t.expand(request.args.get)
+            t.expand(user, page=2)
+
+        Only the variables of the template are looked up, each of them
+        once. Variables that are ``None``, raise a ``KeyError`` or
+        ``IndexError`` from ``__getitem__``, or are missing attributes are
+        left undefined.
+
         .. note:: Passing values by both parts, may override values in
                   ``var_dict``. For example::
 
@@ -144,11 +331,305 @@ class URITemplate:
                   ``val2`` will be used instead of ``val1``.
 
         """
-        return self._expand(_merge(var_dict, kwargs), False)
+        return self._expand(self._resolve(var_dict, kwargs))
+
+    def expand_bytes(
+        self,
+        var_dict: t.Optional[variable.VariableProvider] = None,
+        **kwargs: variable.VariableValue,
+    ) -> bytes:
+        """Expand the template into ASCII bytes.
+
+        This is what HTTP clients that write request lines to a socket
+        need. Literal text of the template that is not ASCII is
+        percent-encoded as UTF-8.
+
+        Values may be ``bytes`` as well as ``str``, with :meth:`expand` too.
+        Bytes are taken to be UTF-8 already and are percent-encoded octet by
+        octet without being decoded first.
+
+        :param var_dict: Optional dictionary with variables and values, or
+            another provider of values, as accepted by :meth:`expand`
+        :param kwargs: Alternative way to pass arguments
+        :returns: bytes
+
+        Example::
+
+            t = URITemplate('/search{?q}')
+            t.expand_bytes(q=b'caf\\xc3\\xa9')
+            # => b'/search?q=caf%C3%A9'
+
+        """
+        return _ascii(self._expand(self._resolve(var_dict, kwargs)))
+
+    def expand_parts(
+        self,
+        var_dict: t.Optional[variable.VariableProvider] = None,
+        **kwargs: variable.VariableValue,
+    ) -> t.Iterator[str]:
+        """Expand the template piece by piece.
+
+        This yields the literal text of the template, and the prefixes,
+        separators, and encoded values of its expressions, in order and
+        without joining them. Each item of a list or mapping is a piece of
+        its own, and is only encoded when it is reached, so the expansion
+        of a large value is never built as a whole. Joining the pieces gives
+        the same string as :meth:`expand`. Empty pieces are skipped.
+
+        :param var_dict: Optional dictionary with variables and values, or
+            another provider of values, as accepted by :meth:`expand`
+        :param kwargs: Alternative way to pass arguments
+        :returns: iterator of str
+
+        Example::
+
+            t = URITemplate('https://api.github.com/repos{/owner,repo}')
+            list(t.expand_parts(owner='octocat', repo='hello world'))
+            # => ['https://api.github.com/repos', '/', 'octocat', '/',
+            #     'hello%20world']
+
+        """
+        values = self._resolve(var_dict, kwargs)
+        head, segments = self._plan()
+        if head:
+            yield head
+        for var, tail in segments:
+            yield from var._iter_expand(values)
+            if tail:
+                yield tail
+
+    def expand_into(
+        self,
+        write: t.Union[
+            t.Callable[[str], object], _SupportsWrite, t.List[str]
+        ],
+        var_dict: t.Optional[variable.VariableProvider] = None,
+        **kwargs: variable.VariableValue,
+    ) -> None:
+        """Expand the template and write the result piece by piece.
+
+        The expanded URI is never built as a single string: the pieces
+        yielded by :meth:`expand_parts` are passed straight to ``write``.
+
+        :param write: A callable that takes a string, an object with a
+            ``write`` method such as a text file or :class:`io.StringIO`, or
+            a list that the pieces are appended to
+        :param var_dict: Optional dictionary with variables and values, or
+            another provider of values, as accepted by :meth:`expand`
+        :param kwargs: Alternative way to pass arguments
+
+        Example::
+
+            t = URITemplate('https://api.github.com/search{?q*}')
+            with open('uris.txt', 'w') as f:
+                t.expand_into(f, q=terms)
+                f.write('\\n')
+
+        """
+        if isinstance(write, list):
+            emit: t.Callable[[str], object] = write.append
+        elif callable(write):
+            emit = write
+        else:
+            emit = write.write
+        for part in self.expand_parts(var_dict, **kwargs):
+            emit(part)
+
+    def iter_expand(
+        self, var_dicts: t.Iterable[variable.VariableValueMapping]
+    ) -> t.Iterator[str]:
+        """Lazily expand the template once for each mapping given.
+
+        This is equivalent to calling :meth:`expand` for every mapping, but
+        the work that only depends on the template is done once up front.
+        Inputs that repeat a combination of string or numeric values are
+        only expanded the first time they are seen.
+
+        :param var_dicts: Iterable of dictionaries with variables and values
+        :returns: iterator of str
+
+        Example::
+
+            t = URITemplate('https://api.github.com/users{/user}')
+            for uri in t.iter_expand({'user': u} for u in users):
+                print(uri)
+
+        """
+        head, plan = self._plan()
+        if not plan:
+            for _ in var_dicts:
+                yield self.uri
+            return
+
+        segments = [(var._expand, tail) for var, tail in plan]
+        names = tuple(self._variable_names)
+        memoizable = variable._MEMOIZABLE_TYPES.issuperset
+        memo: t.Dict[t.Tuple[t.Any, ...], str] = {}
+        for var_dict in var_dicts:
+            values = tuple(map(var_dict.get, names))
+            types = tuple(map(type, values))
+            if not memoizable(types):
+                yield head + "".join(
+                    [expand(var_dict) + tail for expand, tail in segments]
+                )
+                continue
+            # Keep the types in the key so 1, 1.0 and True stay apart.
+            key = values + types
+            uri = memo.get(key)
+            if uri is None:
+                if len(memo) >= _BATCH_MEMO_SIZE:
+                    memo.clear()
+                uri = memo[key] = head + "".join(
+                    [expand(var_dict) + tail for expand, tail in segments]
+                )
+            yield uri
+
+    def expand_many(
+        self, var_dicts: t.Iterable[variable.VariableValueMapping]
+    ) -> t.List[str]:
+        """Expand the template once for each mapping given.
+
+        :param var_dicts: Iterable of dictionaries with variables and values
+        :returns: list of str, in the same order as ``var_dicts``
+
+        Example::
+
+            t = URITemplate('https://api.github.com/users{/user}{?page}')
+            t.expand_many([{'user': 'octocat'}, {'user': 'hubot', 'page': 2}])
+            # => ['https://api.github.com/users/octocat',
+            #     'https://api.github.com/users/hubot?page=2']
+
+        .. seealso:: :meth:`iter_expand` which does not build the list
+
+        """
+        return list(self.iter_expand(var_dicts))
+
+    def expand_columns(
+        self, columns: t.Mapping[str, t.Iterable[variable.VariableValue]]
+    ) -> t.List[str]:
+        """Expand the template for every row of equal-length columns.
+
+        Row ``i`` is expanded with the ``i``-th value of each column. Instead
+        of building a mapping for every row, each expression is expanded a
+        whole column at a time and every distinct string or numeric value is
+        only encoded once. Variables without a column are undefined.
+
+        Any iterable works as a column. NumPy arrays and pandas Series are
+        converted with their ``tolist()`` method.
+
+        :param dict columns: Mapping of variable names to their values
+        :returns: list of str, one per row
+        :raises ValueError: if the columns do not all have the same length
+
+        Example::
+
+            t = URITemplate('https://api.github.com/repos{/user,repo}')
+            t.expand_columns({
+                'user': ['octocat', 'hubot'],
+                'repo': ['hello-world', 'hubot'],
+            })
+            # => ['https://api.github.com/repos/octocat/hello-world',
+            #     'https://api.github.com/repos/hubot/hubot']
+
+        """
+        values = {name: _as_list(column) for name, column in columns.items()}
+        lengths = {len(column) for column in values.values()}
+        if len(lengths) > 1:
+            raise ValueError("all columns must have the same length")
+        size = lengths.pop() if lengths else 0
+        head, segments = self._plan()
+        if not segments:
+            return [self.uri] * size
+
+        undefined = [None] * size
+        expanded_columns = []
+        for var, _ in segments:
+            fragments = [
+                var._expand_column(spec, values.get(spec.name, undefined))
+                for spec in var.variables
+            ]
+            if len(fragments) == 1:
+                prefix = var._prefix
+                expanded_columns.append(
+                    ["" if f is None else prefix + f for f in fragments[0]]
+                )
+            else:
+                join = var._join
+                expanded_columns.append(
+                    [
+                        join([f for f in row if f is not None])
+                        for row in zip(*fragments)
+                    ]
+                )
+
+        fmt = "%s".join(
+            [head.replace("%", "%%")]
+            + [tail.replace("%", "%%") for _, tail in segments]
+        )
+        return [fmt % row for row in zip(*expanded_columns)]
+
+    def _check_bound(
+        self, values: t.Dict[str, variable.VariableValue]
+    ) -> t.Optional[t.Dict[str, variable.VariableValue]]:
+        """Check the variables bound by partial() against a match.
+
+        Only those of name=value expressions need checking: the matcher
+        takes the fragments of the others as literal text.
+        """
+        names = self._names()
+        for var in self.variables:
+            if var.operator not in matcher._NAMED_OPERATORS:
+                continue
+            for spec, fragment in var._bound.items():
+                value = values.get(spec.name)
+                expanded = variable.URIVariable._expand_variable(
+                    var, spec, value
+                )
+                if expanded != fragment:
+                    return None
+                if spec.name not in names:
+                    values.pop(spec.name, None)
+        return values
+
+    def match(
+        self, uri: str
+    ) -> t.Optional[t.Dict[str, variable.VariableValue]]:
+        """Match a URI against the template and extract the variables.
+
+        This is the reverse of :meth:`expand`. The template is turned into a
+        regular expression the first time it is matched.
+
+        Values are percent-decoded. Parameters of ``{?...}``, ``{&...}``,
+        and ``{;...}`` expressions may appear in any order. Exploded
+        variables are returned as a list, or as a dictionary when every item
+        is a ``key=value`` pair. Variables that the URI does not provide are
+        left out.
+
+        :param str uri: The URI to match
+        :returns: dict of variable names to values, or ``None`` if the URI
+            does not match the template
+
+        Example::
+
+            t = URITemplate('https://api.github.com/users{/user}{?page}')
+            t.match('https://api.github.com/users/octocat?page=2')
+            # => {'user': 'octocat', 'page': '2'}
+            t.match('https://example.com/')
+            # => None
+
+        """
+        if self._matcher is None:
+            self._matcher = matcher.TemplateMatcher(*self._plan())
+        values = self._matcher.match(uri)
+        if values is not None and any(var._bound for var in self.variables):
+            # Variables bound by partial() are matched like the others, but
+            # must have the value they were bound to.
+            return self._check_bound(values)
+        return values
 
     def partial(
         self,
-        var_dict: t.Optional[variable.VariableValueMapping] = None,
+        var_dict: t.Optional[variable.VariableProvider] = None,
         **kwargs: variable.VariableValue,
     ) -> "URITemplate":
         """Partially expand the template with the given parameters.
@@ -156,7 +637,14 @@ class URITemplate:
         If all of the parameters for the template are not given, return a
         partially expanded template.
 
-        :param dict var_dict: Optional dictionary with variables and values
+        Expressions whose variables are all given become literal text of
+        the new template. Expressions where only some of the variables are
+        given keep the others, and expand the given ones to the same text
+        every time. The new template is built from the parsed expressions
+        of this one and is not parsed again.
+
+        :param var_dict: Optional dictionary with variables and values, or
+            another provider of values, as accepted by :meth:`expand`
         :param kwargs: Alternative way to pass arguments
         :returns: :class:`URITemplate`
 
@@ -165,5 +653,123 @@ class URITemplate:
             t = URITemplate('https://api.github.com{/end}')
             t.partial()  # => URITemplate('https://api.github.com{/end}')
 
+            t = URITemplate('https://example.com/search{?q,page}')
+            t = t.partial(q='uritemplate')
+            # => URITemplate('https://example.com/search?q=uritemplate{&page}')
+            t.expand(page=2)
+            # => 'https://example.com/search?q=uritemplate&page=2'
+
+        .. note:: The string of a partially expanded template describes it
+                  as well as possible. When only some of the variables of a
+                  ``{+var}``, ``{#var}``, or ``{?var}`` expression are
+                  given, parsing that string again may not give a template
+                  that expands the same way.
+
         """
-        return URITemplate(self._expand(_merge(var_dict, kwargs), True))
+        values = self._resolve(var_dict, kwargs)
+        head, segments = self._plan()
+        literals = [head]
+        variables: t.List[variable.URIVariable] = []
+        for var, tail in segments:
+            bound = var._bind(values)
+            if isinstance(bound, str):
+                literals[-1] += bound + tail
+            else:
+                variables.append(bound)
+                literals.append(tail)
+        tails = literals[1:]
+        uri = literals[0] + "".join(
+            [
+                var._template_text() + tail
+                for var, tail in zip(variables, tails)
+            ]
+        )
+        return _build(uri, literals[0], variables, tails)
+
+
+# The parsed form of a URITemplate, see URITemplate._state().
+_TemplateState = t.Tuple[
+    int, str, str, t.Tuple[t.Tuple[variable._VariableState, str], ...]
+]
+
+
+def _from_state(state: _TemplateState) -> URITemplate:
+    """Rebuild a URITemplate from its state without parsing it again."""
+    version, uri, head, expressions = state
+    if version != _STATE_VERSION:
+        raise ValueError(
+            f"unsupported serialized template version: {version!r}"
+        )
+    if not (
+        isinstance(uri, str)
+        and isinstance(head, str)
+        and all(isinstance(tail, str) for _, tail in expressions)
+    ):
+        raise ValueError("the template text must be strings")
+    return _build(
+        uri,
+        head,
+        [variable._from_state(var) for var, _ in expressions],
+        [tail for _, tail in expressions],
+    )
+
+
+def _build(
+    uri: str,
+    head: str,
+    variables: t.Sequence[variable.URIVariable],
+    tails: t.Sequence[str],
+) -> URITemplate:
+    """Put a URITemplate together from its parsed parts."""
+    template = URITemplate.__new__(URITemplate)
+    template.uri = uri
+    template._matcher = None
+    template._head = head
+    template._variables = tuple(variables)
+    template._variable_names = orderedset.OrderedSet(
+        name for var in variables for name in var.variable_names
+    )
+    template._segments = tuple(zip(template._variables, tails))
+    return template
+
+
+def dumps(template: URITemplate) -> bytes:
+    """Serialize a parsed template.
+
+    The result holds the parsed form of the template, so :func:`loads` does
+    not have to parse it again. It only contains builtin values and is
+    versioned: data written by another version of uritemplate that lays
+    the parsed form out differently is rejected by :func:`loads`.
+
+    Pickling a :class:`URITemplate` saves the same parsed form.
+
+    :param template: The template to serialize
+    :returns: bytes
+
+    Example::
+
+        data = dumps(URITemplate('https://api.github.com{/end}'))
+        loads(data).expand(end='users')
+        # => 'https://api.github.com/users'
+
+    """
+    return marshal.dumps(template._state())
+
+
+def loads(data: bytes) -> URITemplate:
+    """Load a template serialized by :func:`dumps` without parsing it.
+
+    .. warning:: Like :mod:`pickle`, this is not meant for data from
+                 untrusted sources.
+
+    :param bytes data: The serialized template
+    :returns: :class:`URITemplate`
+    :raises ValueError: if ``data`` is not a template serialized by a
+        compatible version of uritemplate
+
+    """
+    try:
+        state = marshal.loads(data)
+        return _from_state(state)
+    except (EOFError, IndexError, TypeError, ValueError) as error:
+        raise ValueError(f"not a serialized URITemplate: {error}") from None
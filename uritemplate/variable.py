@@ -17,11 +17,14 @@ What do you do?
 
 import collections.abc
 import enum
+import re
 import string
+import types
 import typing as t
-import urllib.parse
 
-ScalarVariableValue = t.Union[int, float, complex, str, None]
+from uritemplate import cache
+
+ScalarVariableValue = t.Union[int, float, complex, str, bytes, None]
 VariableValue = t.Union[
     t.Sequence[ScalarVariableValue],
     t.List[ScalarVariableValue],
@@ -30,6 +33,12 @@ VariableValue = t.Union[
     ScalarVariableValue,
 ]
 VariableValueMapping = t.Mapping[str, VariableValue]
+#: Where :meth:`URITemplate.expand <uritemplate.URITemplate.expand>` looks
+#: up values: a mapping, a callable taking a variable name, an object with
+#: ``__getitem__``, or any other object whose attributes are the variables.
+VariableProvider = t.Union[
+    VariableValueMapping, t.Callable[[str], VariableValue], object
+]
 
 
 _UNRESERVED_CHARACTERS: t.Final[str] = (
@@ -39,6 +48,12 @@ _GEN_DELIMS: t.Final[str] = ":/?#[]@"
 _SUB_DELIMS: t.Final[str] = "!$&'()*+,;="
 _RESERVED_CHARACTERS: t.Final[str] = f"{_GEN_DELIMS}{_SUB_DELIMS}"
 
+# Values of these types always expand the same way, so their expansion can be
+# reused when the same value is seen again.
+_MEMOIZABLE_TYPES: t.Final[t.FrozenSet[type]] = frozenset(
+    (str, int, float, type(None))
+)
+
 
 class Operator(enum.Enum):
     # Section 2.2. Expressions
@@ -150,19 +165,12 @@ class Operator(enum.Enum):
         return quote(value, "")
 
     def _only_quote_unquoted_characters(self, value: str) -> str:
-        if urllib.parse.unquote(value) == value:
-            return quote(value, _RESERVED_CHARACTERS)
-        return value
+        return _quote_keeping_triplets(value)
 
     def quote(self, value: t.Any) -> str:
-        if not isinstance(value, (str, bytes)):
-            value = str(value)
-        if isinstance(value, bytes):
-            value = value.decode()
-
         if self == Operator.reserved or self == Operator.fragment:
-            return self._only_quote_unquoted_characters(value)
-        return self._always_quote(value)
+            return _quote_value_keeping_triplets(value)
+        return _quote_value(value)
 
     @staticmethod
     def from_string(s: str) -> "Operator":
@@ -185,6 +193,60 @@ _operators: t.Final[t.Dict[str, Operator]] = {
 }
 
 
+class VarSpec(t.NamedTuple):
+    """One variable of an expression, e.g. ``list*`` or ``var:3``."""
+
+    #: The name of the variable
+    name: str
+    #: Whether the value is exploded (``*``)
+    explode: bool
+    #: The maximum length of the value (``:3``), if any
+    prefix: t.Optional[int]
+
+
+class _Items(t.NamedTuple):
+    """The expansion of a list or mapping value, item by item.
+
+    It is ``lead`` followed by the ``items`` joined with ``separator``. The
+    items are produced lazily, so they can be joined at once or written out
+    one by one without building the whole expansion.
+    """
+
+    lead: str
+    separator: str
+    items: t.Iterable[str]
+
+    def join(self) -> str:
+        return self.lead + self.separator.join(self.items)
+
+    def pieces(self) -> t.Iterator[str]:
+        if self.lead:
+            yield self.lead
+        separator = ""
+        for item in self.items:
+            if separator:
+                yield separator
+            separator = self.separator
+            if item:
+                yield item
+
+
+# What an expansion method returns for a value that is not undefined
+_Fragment = t.Union[str, _Items]
+
+
+def _joined(fragment: t.Optional[_Fragment]) -> t.Optional[str]:
+    if isinstance(fragment, _Items):
+        return fragment.join()
+    return fragment
+
+
+# Shared by every URIVariable that has no default values.
+_NO_DEFAULTS: t.Final[t.Mapping[str, ScalarVariableValue]] = (
+    types.MappingProxyType({})
+)
+
+
 class URIVariable:
     """This object validates everything inside the URITemplate object.
 
@@ -204,28 +266,90 @@ class URIVariable:
 
     """
 
+    __slots__ = (
+        "original",
+        "_operator",
+        "variables",
+        "defaults",
+        # How the operator expands values, bound when it is set.
+        "_expansion",
+        "_prefix",
+        "_separator",
+        "_safe",
+        "_quote",
+    )
+
     def __init__(self, var: str):
         #: The original string that comes through with the variable
         self.original: str = var
-        #: The operator for the variable
-        self.operator: Operator = Operator.default
-        #: List of variables in this variable
-        self.variables: t.List[t.Tuple[str, t.MutableMapping[str, t.Any]]] = (
-            []
-        )
-        #: List of variable names
-        self.variable_names: t.List[str] = []
-        #: List of defaults passed in
-        self.defaults: t.MutableMapping[str, ScalarVariableValue] = {}
+        self._operator: Operator
+        self._expansion: _Expansion
+        self._prefix: str
+        self._separator: str
+        self._safe: str
+        self._quote: t.Callable[[t.Any], str]
+        self.operator = Operator.default
+        #: The variables in this variable, as :class:`VarSpec`\ s
+        self.variables: t.Tuple[VarSpec, ...] = ()
+        #: Defaults passed in
+        self.defaults: t.Mapping[str, ScalarVariableValue] = _NO_DEFAULTS
         # Parse the variable itself.
         self.parse()
 
+    #: Fragments of the variables bound by a partial expansion, see
+    #: :meth:`_bind`
+    _bound: t.Mapping[VarSpec, str] = types.MappingProxyType({})
+
+    def _state(self) -> "_VariableState":
+        """Return the parsed variable as a tuple of builtin values."""
+        return (
+            self.original,
+            self._operator.value,
+            # Plain tuples, marshal does not support named tuples.
+            tuple(
+                (spec.name, spec.explode, spec.prefix)
+                for spec in self.variables
+            ),
+            tuple(self.defaults.items()),
+            tuple(
+                (index, self._bound[spec])
+                for index, spec in enumerate(self.variables)
+                if spec in self._bound
+            ),
+        )
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        return (_from_state, (self._state(),))
+
     def __repr__(self) -> str:
         return "URIVariable(%s)" % self
 
     def __str__(self) -> str:
         return self.original
 
+    @property
+    def operator(self) -> Operator:
+        """The operator for the variable"""
+        return self._operator
+
+    @operator.setter
+    def operator(self, operator: Operator) -> None:
+        # Look up everything that depends on the operator once, so that
+        # expanding a value never has to compare operators.
+        (
+            self._expansion,
+            self._prefix,
+            self._separator,
+            self._safe,
+            self._quote,
+        ) = _bindings[operator]
+        self._operator = operator
+
+    @property
+    def variable_names(self) -> t.List[str]:
+        """List of variable names"""
+        return [spec.name for spec in self.variables]
+
     def parse(self) -> None:
         """Parse the variable.
 
@@ -242,6 +366,8 @@ class URIVariable:
             var_list_str = self.original[1:]
 
         var_list = var_list_str.split(",")
+        specs = []
+        defaults = {}
 
         for var in var_list:
             default_val = None
@@ -260,40 +386,41 @@ class URIVariable:
                 prefix = int(prefix_str, 10)
 
             if default_val:
-                self.defaults[name] = default_val
+                defaults[name] = default_val
 
-            self.variables.append(
-                (name, {"explode": explode, "prefix": prefix})
-            )
+            specs.append(VarSpec(name, explode, prefix))
 
-        self.variable_names = [varname for (varname, _) in self.variables]
+        self.variables = tuple(specs)
+        if defaults:
+            self.defaults = types.MappingProxyType(defaults)
 
-    def _query_expansion(
+    def _query_fragments(
         self,
         name: str,
         value: VariableValue,
         explode: bool,
         prefix: t.Optional[int],
-    ) -> t.Optional[str]:
-        """Expansion method for the '?' and '&' operators."""
+    ) -> t.Optional[_Fragment]:
+        """Expansion method for the '?' and '&' operators, item by item."""
         if value is None:
             return None
 
         tuples, items = is_list_of_tuples(value)
 
-        safe = self.operator.reserved_characters()
-        _quote = self.operator.quote
+        safe = self._safe
+        _quote = self._quote
         if list_test(value) and not tuples:
             if not value:
                 return None
             value = t.cast(t.Sequence[ScalarVariableValue], value)
             if explode:
-                return self.operator.expansion_separator().join(
-                    f"{name}={_quote(v)}" for v in value
+                return _Items(
+                    "",
+                    self._separator,
+                    (f"{name}={_quote(v)}" for v in value),
                 )
             else:
-                value = ",".join(_quote(v) for v in value)
-                return f"{name}={value}"
+                return _Items(f"{name}=", ",", (_quote(v) for v in value))
 
         if dict_test(value) or tuples:
             if not value:
@@ -301,14 +428,17 @@ class URIVariable:
             value = t.cast(t.Mapping[str, ScalarVariableValue], value)
             items = items or sorted(value.items())
             if explode:
-                return self.operator.expansion_separator().join(
-                    f"{quote(k, safe)}={_quote(v)}" for k, v in items
+                return _Items(
+                    "",
+                    self._separator,
+                    (f"{quote(k, safe)}={_quote(v)}" for k, v in items),
                 )
             else:
-                value = ",".join(
-                    f"{quote(k, safe)},{_quote(v)}" for k, v in items
+                return _Items(
+                    f"{name}=",
+                    ",",
+                    (f"{quote(k, safe)},{_quote(v)}" for k, v in items),
                 )
-                return f"{name}={value}"
 
         if value:
             value = t.cast(t.Text, value)
@@ -316,20 +446,21 @@ class URIVariable:
             return f"{name}={_quote(value)}"
         return name + "="
 
-    def _label_path_expansion(
+    def _label_path_fragments(
         self,
         name: str,
         value: VariableValue,
         explode: bool,
         prefix: t.Optional[int],
-    ) -> t.Optional[str]:
-        """Label and path expansion method.
+    ) -> t.Optional[_Fragment]:
+        """Label and path expansion method, item by item.
 
         Expands for operators: '/', '.'
 
         """
-        join_str = self.operator.expansion_separator()
-        safe = self.operator.reserved_characters()
+        join_str = self._separator
+        safe = self._safe
+        _quote = self._quote
 
         if value is None or (
             not isinstance(value, (str, int, float, complex))
@@ -344,40 +475,52 @@ class URIVariable:
                 join_str = ","
 
             value = t.cast(t.Sequence[ScalarVariableValue], value)
-            fragments = [
-                self.operator.quote(v) for v in value if v is not None
-            ]
-            return join_str.join(fragments) if fragments else None
+            if all(v is None for v in value):
+                return None
+            return _Items(
+                "", join_str, (_quote(v) for v in value if v is not None)
+            )
 
         if dict_test(value) or tuples:
             value = t.cast(t.Mapping[str, ScalarVariableValue], value)
             items = items or sorted(value.items())
-            format_str = "%s=%s"
-            if not explode:
-                format_str = "%s,%s"
-                join_str = ","
-
-            expanded = join_str.join(
-                format_str % (quote(k, safe), self.operator.quote(v))
-                for k, v in items
-                if v is not None
+            if all(v is None for _, v in items):
+                return None
+            if explode:
+                return _Items(
+                    "",
+                    join_str,
+                    (
+                        f"{quote(k, safe)}={_quote(v)}"
+                        for k, v in items
+                        if v is not None
+                    ),
+                )
+            return _Items(
+                "",
+                ",",
+                (
+                    f"{quote(k, safe)},{_quote(v)}"
+                    for k, v in items
+                    if v is not None
+                ),
             )
-            return expanded if expanded else None
 
         value = t.cast(t.Text, value)
         value = value[:prefix] if prefix else value
-        return self.operator.quote(value)
+        return _quote(value)
 
-    def _semi_path_expansion(
+    def _semi_path_fragments(
         self,
         name: str,
         value: VariableValue,
         explode: bool,
         prefix: t.Optional[int],
-    ) -> t.Optional[str]:
-        """Expansion method for ';' operator."""
-        join_str = self.operator.expansion_separator()
-        safe = self.operator.reserved_characters()
+    ) -> t.Optional[_Fragment]:
+        """Expansion method for ';' operator, item by item."""
+        join_str = self._separator
+        safe = self._safe
+        _quote = self._quote
 
         if value is None:
             return None
@@ -387,68 +530,132 @@ class URIVariable:
         if list_test(value) and not tuples:
             value = t.cast(t.Sequence[ScalarVariableValue], value)
             if explode:
-                expanded = join_str.join(
-                    f"{name}={quote(v, safe)}" for v in value if v is not None
+                if all(v is None for v in value):
+                    return None
+                return _Items(
+                    "",
+                    join_str,
+                    (
+                        f"{name}={quote(v, safe)}"
+                        for v in value
+                        if v is not None
+                    ),
                 )
-                return expanded if expanded else None
             else:
-                value = ",".join(quote(v, safe) for v in value)
-                return f"{name}={value}"
+                return _Items(
+                    f"{name}=", ",", (quote(v, safe) for v in value)
+                )
 
         if dict_test(value) or tuples:
             value = t.cast(t.Mapping[str, ScalarVariableValue], value)
             items = items or sorted(value.items())
 
             if explode:
-                return join_str.join(
-                    f"{quote(k, safe)}={self.operator.quote(v)}"
-                    for k, v in items
-                    if v is not None
+                return _Items(
+                    "",
+                    join_str,
+                    (
+                        f"{quote(k, safe)}={_quote(v)}"
+                        for k, v in items
+                        if v is not None
+                    ),
                 )
             else:
-                expanded = ",".join(
-                    f"{quote(k, safe)},{self.operator.quote(v)}"
-                    for k, v in items
-                    if v is not None
+                return _Items(
+                    f"{name}=",
+                    ",",
+                    (
+                        f"{quote(k, safe)},{_quote(v)}"
+                        for k, v in items
+                        if v is not None
+                    ),
                 )
-                return f"{name}={expanded}"
 
         value = t.cast(t.Text, value)
         value = value[:prefix] if prefix else value
         if value:
-            return f"{name}={self.operator.quote(value)}"
+            return f"{name}={_quote(value)}"
 
         return name
 
-    def _string_expansion(
+    def _string_fragments(
         self,
         name: str,
         value: VariableValue,
         explode: bool,
         prefix: t.Optional[int],
-    ) -> t.Optional[str]:
+    ) -> t.Optional[_Fragment]:
         if value is None:
             return None
 
         tuples, items = is_list_of_tuples(value)
+        _quote = self._quote
 
         if list_test(value) and not tuples:
             value = t.cast(t.Sequence[ScalarVariableValue], value)
-            return ",".join(self.operator.quote(v) for v in value)
+            return _Items("", ",", (_quote(v) for v in value))
 
         if dict_test(value) or tuples:
             value = t.cast(t.Mapping[str, ScalarVariableValue], value)
             items = items or sorted(value.items())
-            format_str = "%s=%s" if explode else "%s,%s"
-
-            return ",".join(
-                format_str % (self.operator.quote(k), self.operator.quote(v))
-                for k, v in items
+            if explode:
+                return _Items(
+                    "", ",", (f"{_quote(k)}={_quote(v)}" for k, v in items)
+                )
+            return _Items(
+                "", ",", (f"{_quote(k)},{_quote(v)}" for k, v in items)
             )
 
         value = t.cast(t.Text, value)
         value = value[:prefix] if prefix else value
-        return self.operator.quote(value)
+        return _quote(value)
+
+    def _query_expansion(
+        self,
+        name: str,
+        value: VariableValue,
+        explode: bool,
+        prefix: t.Optional[int],
+    ) -> t.Optional[str]:
+        """Expansion method for the '?' and '&' operators."""
+        return _joined(self._query_fragments(name, value, explode, prefix))
+
+    def _label_path_expansion(
+        self,
+        name: str,
+        value: VariableValue,
+        explode: bool,
+        prefix: t.Optional[int],
+    ) -> t.Optional[str]:
+        """Label and path expansion method.
+
+        Expands for operators: '/', '.'
+
+        """
+        return _joined(
+            self._label_path_fragments(name, value, explode, prefix)
+        )
+
+    def _semi_path_expansion(
+        self,
+        name: str,
+        value: VariableValue,
+        explode: bool,
+        prefix: t.Optional[int],
+    ) -> t.Optional[str]:
+        """Expansion method for ';' operator."""
+        return _joined(
+            self._semi_path_fragments(name, value, explode, prefix)
+        )
+
+    def _string_expansion(
+        self,
+        name: str,
+        value: VariableValue,
+        explode: bool,
+        prefix: t.Optional[int],
+    ) -> t.Optional[str]:
+        return _joined(self._string_fragments(name, value, explode, prefix))
 
     def expand(
         self, var_dict: t.Optional[VariableValueMapping] = None
@@ -479,56 +686,289 @@ class URIVariable:
             #     '?var=value&hello=Hello%20World%21&x=1024&y=768'}
 
         """
-        return_values = []
         if var_dict is None:
             return {self.original: self.original}
+        return {self.original: self._expand(var_dict)}
 
-        for name, opts in self.variables:
-            value = var_dict.get(name, None)
-            if not value and value != "" and name in self.defaults:
-                value = self.defaults[name]
+    def _expand(self, var_dict: VariableValueMapping) -> str:
+        """Expand the variable and return only the expanded string.
 
-            if value is None:
+        This is what :class:`~uritemplate.template.URITemplate` uses to fill
+        in the expressions of its compiled template.
+        """
+        return_values = []
+        for spec in self.variables:
+            expanded = self._expand_variable(
+                spec, var_dict.get(spec.name, None)
+            )
+            if expanded is not None:
+                return_values.append(expanded)
+        return self._join(return_values)
+
+    def _iter_expand(self, var_dict: VariableValueMapping) -> t.Iterator[str]:
+        """Expand the variable piece by piece.
+
+        This yields the same text as :meth:`_expand` without joining it: the
+        prefix or separator, and the expansion of each variable, or of each
+        item of a list or mapping, separately. Empty pieces are skipped.
+        """
+        lead = self._prefix
+        for spec in self.variables:
+            expanded: t.Optional[_Fragment] = self._bound.get(spec)
+            if expanded is None:
+                expanded = self._expand_value(
+                    spec, var_dict.get(spec.name, None)
+                )
+            if expanded is None:
                 continue
+            if lead:
+                yield lead
+            lead = self._separator
+            if isinstance(expanded, _Items):
+                yield from expanded.pieces()
+            elif expanded:
+                yield expanded
+
+    def _expand_variable(
+        self, spec: VarSpec, value: t.Any
+    ) -> t.Optional[str]:
+        return _joined(self._expand_value(spec, value))
 
-            expanded = None
-            if (
-                self.operator == Operator.path_segment
-                or self.operator == Operator.label_with_dot_prefix
-            ):
-                expansion = self._label_path_expansion
-            elif (
-                self.operator == Operator.form_style_query
-                or self.operator == Operator.form_style_query_continuation
-            ):
-                expansion = self._query_expansion
-            elif self.operator == Operator.path_style_parameter:
-                expansion = self._semi_path_expansion
-            else:
-                expansion = self._string_expansion
-            # match self.operator:
-            #     case Operator.path_segment | Operator.label_with_dot_prefix:
-            #         expansion = self._label_path_expansion
-            #     case (Operator.form_style_query |
-            #           Operator.form_style_query_continuation):
-            #         expansion = self._query_expansion
-            #     case Operator.path_style_parameter:
-            #         expansion = self._semi_path_expansion
-            #     case _:
-            #         expansion = self._string_expansion
-
-            expanded = expansion(name, value, opts["explode"], opts["prefix"])
+    def _expand_value(
+        self, spec: VarSpec, value: t.Any
+    ) -> t.Optional[_Fragment]:
+        name = spec.name
+        if not value and value != "" and name in self.defaults:
+            value = self.defaults[name]
+
+        if value is None:
+            return None
+
+        return self._expansion(self, name, value, spec.explode, spec.prefix)
+
+    def _bind(
+        self, var_dict: VariableValueMapping
+    ) -> t.Union[str, "URIVariable"]:
+        """Expand the variables that have a value and keep the others.
 
+        This is what :meth:`URITemplate.partial
+        <uritemplate.template.URITemplate.partial>` uses. It returns the
+        expansion when every variable is bound, and otherwise a variable
+        that expands the bound ones to their fragment.
+        """
+        bound = dict(self._bound)
+        for spec in self.variables:
+            if spec in bound:
+                continue
+            value = var_dict.get(spec.name, None)
+            if value is None:
+                continue
+            expanded = self._expand_variable(spec, value)
             if expanded is not None:
-                return_values.append(expanded)
+                bound[spec] = expanded
+        if len(bound) == len(self._bound):
+            return self
+        if all(spec in bound for spec in self.variables):
+            return self._join([bound[spec] for spec in self.variables])
+        return _PartialVariable(self, bound)
+
+    def _template_text(self) -> str:
+        """Return the expression as it is written in a template."""
+        return "{%s}" % self.original
+
+    def _expand_column(
+        self, spec: VarSpec, values: t.Iterable[t.Any]
+    ) -> t.List[t.Optional[str]]:
+        """Expand one of this expression's variables for many values.
+
+        Each distinct string or numeric value is only encoded once.
+        """
+        memo: t.Dict[t.Any, t.Optional[str]] = {}
+        expanded: t.List[t.Optional[str]] = []
+        append = expanded.append
+        for value in values:
+            if value.__class__ not in _MEMOIZABLE_TYPES:
+                append(self._expand_variable(spec, value))
+                continue
+            # The type is part of the key because 1, 1.0 and True are equal
+            # but expand differently.
+            key = (value.__class__, value)
+            try:
+                fragment = memo[key]
+            except KeyError:
+                fragment = memo[key] = self._expand_variable(spec, value)
+            append(fragment)
+        return expanded
+
+    def _join(self, fragments: t.Sequence[str]) -> str:
+        if fragments:
+            return self._prefix + self._separator.join(fragments)
+        return ""
+
+
+# How an expression goes on after the variables that were already expanded,
+# for operators whose prefix is not their separator.
+_CONTINUATIONS: t.Final[t.Dict[Operator, Operator]] = {
+    Operator.default: Operator.reserved_comma,
+    Operator.form_style_query: Operator.form_style_query_continuation,
+}
+
+
+class _PartialVariable(URIVariable):
+    """An expression where some, but not all, variables are bound.
 
-        value = ""
-        if return_values:
-            value = (
-                self.operator.variable_prefix()
-                + self.operator.expansion_separator().join(return_values)
+    Bound variables always expand to the fragment they were bound to,
+    whatever value is given for them later.
+    """
+
+    __slots__ = ("_bound",)
+
+    def __init__(self, var: URIVariable, bound: t.Dict[VarSpec, str]):
+        # Share the parsed form instead of parsing the expression again.
+        self.original = var.original
+        self.operator = var.operator
+        self.variables = var.variables
+        self.defaults = var.defaults
+        self._bound = types.MappingProxyType(bound)
+
+    @property
+    def variable_names(self) -> t.List[str]:
+        """List of the names of the variables that are not bound"""
+        return [
+            spec.name for spec in self.variables if spec not in self._bound
+        ]
+
+    def _expand_variable(
+        self, spec: VarSpec, value: t.Any
+    ) -> t.Optional[str]:
+        fragment = self._bound.get(spec)
+        if fragment is not None:
+            return fragment
+        return super()._expand_variable(spec, value)
+
+    def _template_text(self) -> str:
+        """Describe the expression as template text, as well as possible.
+
+        Bound variables are written out as their fragments and the others
+        as expressions. For the ``{+var}``, ``{#var}``, and ``{?var}``
+        operators, this is not always equivalent.
+        """
+        operator = self.operator
+        continuation = _CONTINUATIONS.get(operator, operator).value
+        if operator in (Operator.reserved, Operator.fragment):
+            continuation = Operator.reserved.value
+        parts: t.List[str] = []
+        pending: t.List[str] = []
+        for spec in self.variables:
+            fragment = self._bound.get(spec)
+            if fragment is None:
+                text = spec.name + ("*" if spec.explode else "")
+                if spec.prefix is not None:
+                    text += f":{spec.prefix}"
+                if spec.name in self.defaults:
+                    text += "=" + t.cast(str, self.defaults[spec.name])
+                pending.append(text)
+                continue
+            if pending:
+                start = operator.value if not parts else continuation
+                parts.append(f"{{{start}{','.join(pending)}}}")
+                pending = []
+            parts.append(
+                (self._separator if parts else self._prefix) + fragment
             )
-        return {self.original: value}
+        if pending:
+            parts.append(f"{{{continuation}{','.join(pending)}}}")
+        return "".join(parts)
+
+
+# An unbound expansion method of URIVariable.
+_Expansion = t.Callable[
+    [URIVariable, str, VariableValue, bool, t.Optional[int]],
+    t.Optional[_Fragment],
+]
+
+
+class _Binding(t.NamedTuple):
+    """Everything about an operator that expanding a value depends on."""
+
+    expansion: _Expansion
+    prefix: str
+    separator: str
+    safe: str
+    quote: t.Callable[[t.Any], str]
+
+
+def _bind(operator: Operator) -> _Binding:
+    expansion: _Expansion
+    if operator in (Operator.path_segment, Operator.label_with_dot_prefix):
+        expansion = URIVariable._label_path_fragments
+    elif operator in (
+        Operator.form_style_query,
+        Operator.form_style_query_continuation,
+    ):
+        expansion = URIVariable._query_fragments
+    elif operator == Operator.path_style_parameter:
+        expansion = URIVariable._semi_path_fragments
+    else:
+        expansion = URIVariable._string_fragments
+    if operator in (Operator.reserved, Operator.fragment):
+        quote_value = _quote_value_keeping_triplets
+    else:
+        quote_value = _quote_value
+    return _Binding(
+        expansion,
+        operator.variable_prefix(),
+        operator.expansion_separator(),
+        operator.reserved_characters(),
+        quote_value,
+    )
+
+
+# The parsed form of a URIVariable: its original text, operator, variables,
+# and defaults, made of builtin types only so that it can be marshalled.
+_VariableState = t.Tuple[
+    str,
+    str,
+    t.Tuple[t.Tuple[str, bool, t.Optional[int]], ...],
+    t.Tuple[t.Tuple[str, ScalarVariableValue], ...],
+    t.Tuple[t.Tuple[int, str], ...],
+]
+
+
+def _from_state(state: _VariableState) -> URIVariable:
+    """Rebuild a URIVariable from its state without parsing it again."""
+    original, operator, specs, defaults, bound = state
+    if not isinstance(original, str):
+        raise ValueError("the expression text must be a string")
+    if operator != "" and operator not in _operators:
+        raise ValueError(f"unknown operator: {operator!r}")
+    for name, explode, prefix in specs:
+        if not (
+            isinstance(name, str)
+            and isinstance(explode, bool)
+            and (prefix is None or type(prefix) is int)
+        ):
+            raise ValueError(f"malformed variable: {name!r}")
+    for name, value in defaults:
+        if not (isinstance(name, str) and isinstance(value, str)):
+            raise ValueError(f"malformed default of {name!r}")
+    var = URIVariable.__new__(URIVariable)
+    var.original = original
+    var.operator = _operators.get(operator, Operator.default)
+    var.variables = tuple(map(VarSpec._make, specs))
+    var.defaults = (
+        types.MappingProxyType(dict(defaults)) if defaults else _NO_DEFAULTS
+    )
+    if bound:
+        fragments = {}
+        for index, fragment in bound:
+            if not 0 <= index < len(var.variables):
+                raise IndexError(f"no variable {index} to bind")
+            if not isinstance(fragment, str):
+                raise TypeError("bound fragments must be strings")
+            fragments[var.variables[index]] = fragment
+        return _PartialVariable(var, fragments)
+    return var
 
 
 def is_list_of_tuples(
@@ -552,13 +992,149 @@ def dict_test(value: t.Any) -> bool:
     return isinstance(value, (dict, collections.abc.MutableMapping))
 
 
-def _encode(value: t.AnyStr, encoding: str = "utf-8") -> bytes:
+# Percent-encoding tables for str.translate, keyed on the characters (beyond
+# the unreserved ones) that are left alone. Each table maps every other byte
+# value to its "%XX" escape.
+_quote_tables: t.Dict[str, t.Dict[int, str]] = {}
+# A "%" that does not start a pct-encoded triplet.
+_lone_percent_re: t.Final["re.Pattern[str]"] = re.compile(
+    "%(?![0-9A-Fa-f]{2})"
+)
+
+
+def _quote_table(safe: str) -> t.Dict[int, str]:
+    table = _quote_tables.get(safe)
+    if table is None:
+        keep = {ord(c) for c in _UNRESERVED_CHARACTERS + safe if c.isascii()}
+        table = _quote_tables[safe] = {
+            byte: "%%%02X" % byte for byte in range(256) if byte not in keep
+        }
+    return table
+
+
+def _as_octets(value: t.Union[str, bytes]) -> str:
+    """Represent the UTF-8 encoding of ``value`` one character per byte.
+
+    ASCII strings are already in that form, everything else is encoded and
+    decoded as latin-1 so that str.translate can escape it byte by byte.
+    """
     if isinstance(value, str):
-        return value.encode(encoding)
-    return value
+        if value.isascii():
+            return value
+        value = value.encode("utf-8")
+    return value.decode("latin-1")
+
+
+_unreserved_table: t.Final = _quote_table("")
+_reserved_table: t.Final = _quote_table(_RESERVED_CHARACTERS + "%")
+
+
+def _encode_keeping_triplets(value: t.Union[str, bytes]) -> str:
+    """Quote everything but reserved characters and pct-encoded triplets.
+
+    This is the encoding used by the ``+`` and ``#`` operators.
+    """
+    quoted = _as_octets(value).translate(_reserved_table)
+    if "%" in quoted:
+        # Every escape added by translate is a valid triplet that starts
+        # with "%", so it is never matched here and never completes a stray
+        # "%" from the value.
+        quoted = _lone_percent_re.sub("%25", quoted)
+    return quoted
+
+
+def _encode(value: t.Union[str, bytes], safe: str) -> str:
+    if safe:
+        return _as_octets(value).translate(_quote_table(safe))
+    return _as_octets(value).translate(_unreserved_table)
+
+
+# Key of the quote cache: the value and the safe characters, or None for the
+# encoding of the + and # operators.
+_QuoteKey = t.Tuple[t.Union[str, bytes], t.Optional[str]]
+
+
+def _encode_key(key: _QuoteKey) -> str:
+    value, safe = key
+    if safe is None:
+        return _encode_keeping_triplets(value)
+    return _encode(value, safe)
+
+
+# Optional cache of encoded values, see set_quote_cache_size().
+_quote_cache: t.Optional[cache.ShardedLRUCache[_QuoteKey, str]] = None
+
+
+def set_quote_cache_size(maxsize: int) -> None:
+    """Cache up to ``maxsize`` percent-encoded values.
+
+    When the same values are expanded over and over again, e.g. tenant
+    identifiers, API versions, or the keys of an exploded query mapping,
+    the cache saves encoding them every time. Letters and digits need no
+    encoding and are never cached. The cache is disabled by default and a
+    ``maxsize`` of ``0`` disables it again.
+
+    :param int maxsize: The maximum number of encoded values to keep
+    """
+    global _quote_cache
+    if maxsize < 0:
+        raise ValueError("maxsize must be a non-negative integer")
+    if not maxsize:
+        _quote_cache = None
+    elif _quote_cache is None:
+        _quote_cache = cache.ShardedLRUCache(maxsize)
+    else:
+        _quote_cache.resize(maxsize)
+
+
+def quote_cache_info() -> cache.CacheInfo:
+    """Report statistics about the cache of percent-encoded values."""
+    if _quote_cache is None:
+        return cache.CacheInfo(0, 0, 0, 0, 0)
+    return _quote_cache.info()
+
+
+def quote_cache_clear() -> None:
+    """Empty the cache of percent-encoded values and reset its statistics."""
+    if _quote_cache is not None:
+        _quote_cache.clear()
+
+
+def _quote_keeping_triplets(value: t.Union[str, bytes]) -> str:
+    if value.isascii() and value.isalnum():
+        return value if isinstance(value, str) else value.decode("ascii")
+    if _quote_cache is not None:
+        return _quote_cache.get_or_create((value, None), _encode_key)
+    return _encode_keeping_triplets(value)
 
 
 def quote(value: t.Any, safe: str) -> str:
     if not isinstance(value, (str, bytes)):
         value = str(value)
-    return urllib.parse.quote(_encode(value), safe)
+    if value.isascii() and value.isalnum():
+        # Letters and digits are never escaped.
+        return value if isinstance(value, str) else value.decode("ascii")
+    if _quote_cache is not None:
+        return _quote_cache.get_or_create((value, safe), _encode_key)
+    return _encode(value, safe)
+
+
+def _quote_value(value: t.Any) -> str:
+    """Quote a value for every operator but ``+`` and ``#``.
+
+    Bytes are taken to be UTF-8 already and are escaped octet by octet
+    without being decoded first.
+    """
+    return quote(value, "")
+
+
+def _quote_value_keeping_triplets(value: t.Any) -> str:
+    """Quote a value for the ``+`` and ``#`` operators."""
+    if not isinstance(value, (str, bytes)):
+        value = str(value)
+    return _quote_keeping_triplets(value)
+
+
+_bindings: t.Final[t.Dict[Operator, _Binding]] = {
+    operator: _bind(operator) for operator in Operator
+}